@@ -1,6 +1,25 @@
 import argparse
 import inspect
+import types
 from datetime import datetime
+from typing import Annotated, Any, Optional, Union, get_args, get_origin
+
+def unwrap_annotation(annotation: Any) -> Any:
+    """Annotated[Optional[list[str]], ...] -> list: снимает Annotated, Optional и параметры коллекций"""
+    if get_origin(annotation) is Annotated:
+        annotation = get_args(annotation)[0]
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            annotation = args[0]
+    return get_origin(annotation) or annotation
+
+def annotation_help(annotation: Any) -> Optional[str]:
+    if get_origin(annotation) is Annotated:
+        metadata = annotation.__metadata__
+        if metadata and isinstance(metadata[0], str):
+            return metadata[0]
+    return None
 
 class ArgParser:
     def __init__(self, controller):
@@ -21,14 +40,17 @@ class ArgParser:
                     continue
                     
                 kwargs = {}
+                annotation = unwrap_annotation(param.annotation)
+                if help_text := annotation_help(param.annotation):
+                    kwargs["help"] = help_text
                 
-                if param.annotation == bool:
+                if annotation == bool:
                     kwargs["action"] = "store_true"
-                elif param.annotation == list:
+                elif annotation == list:
                     kwargs["nargs"] = "*"
-                elif param.annotation == int:
+                elif annotation == int:
                     kwargs["type"] = int
-                elif param.annotation == datetime:
+                elif annotation == datetime:
                     kwargs["type"] = str
                 else:
                     kwargs["type"] = str
@@ -57,8 +79,9 @@ class ArgParser:
                 continue
                 
             value = getattr(args, param_name)
+            annotation = unwrap_annotation(param.annotation)
             
-            if param.annotation == datetime and value is not None:
+            if annotation == datetime and value is not None:
                 formats = ["%Y-%m-%d", "%Y-%m-%d %H:%M:%S"]
                 for fmt in formats:
                     try:
@@ -69,11 +92,11 @@ class ArgParser:
                 else:
                     raise ValueError(f"Invalid datetime format: {value}")
             
-            elif param.annotation == list and value is not None:
-                if isinstance(value, str):
-                    value = [item.strip() for item in value.split(",")]
-                elif not isinstance(value, list):
+            elif annotation == list and value is not None:
+                if not isinstance(value, list):
                     value = [value]
+                # "--include_tags a,b c" -> ['a', 'b', 'c']: каждый элемент nargs может быть списком через запятую
+                value = [part.strip() for item in value for part in str(item).split(",") if part.strip()]
             
             kwargs[param_name] = value
         
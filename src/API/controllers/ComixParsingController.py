@@ -25,6 +25,8 @@ class ComixParsingController:
         uploader_names: Annotated[Optional[list[str]], "Загрузчики манги"]=[],
         include_tags: Annotated[Optional[list[str]], "Обязательные теги"]=[],
         except_tags: Annotated[Optional[list[str]], "Исключить мангу с тегами"]=[],
+        types: Annotated[Optional[list[str]], "Типы манги (Манга, Манхва, ...)"]=[],
+        incremental: Annotated[bool, "Остановиться на карточках, сохранённых прошлым обходом"]=False,
     ) -> dict:
         """
         Скачивание манги с указанными фильтрами и параметрами
@@ -40,13 +42,15 @@ class ComixParsingController:
         - uploader_names: Optional[list[str]]: Загрузчики манги, default=[],
         - include_tags: Optional[list[str]]: Обязательные теги, default=[],
         - except_tags: Optional[list[str]]: Исключить мангу с тегами, default=[],
+        - types: Optional[list[str]]: Типы манги (Манга, Манхва, ...), default=[],
+        - incremental: bool: Остановиться на карточках, сохранённых прошлым обходом, default=False,
         """
         self.logger.info(f"Инициализация процесса парсинга с заданными параметрами")
         try:
             result = await self._comix_service.parse(
                 source = source,
                 start_page = int(start_page),
-                end_page = int(end_page),
+                end_page = int(end_page) if end_page is not None else None,
                 start_date = start_date,
                 end_date = end_date,
                 author_names = author_names,
@@ -54,6 +58,8 @@ class ComixParsingController:
                 uploader_names = uploader_names,
                 include_tags = include_tags,
                 except_tags = except_tags,
+                types = types,
+                incremental = incremental,
             )
             
             self.logger.info(f"Завершение процесса парсинга с заданными параметрами")
@@ -61,4 +67,34 @@ class ComixParsingController:
         except NoOneAvailableDomen:
             self.logger.critical("Парсинг был досрочно завершён из-за отсутствия доступных доменов", exc_info=False)
         except Exception as ex:
-            self.logger.critical(f"Парсинг был досрочно завершён из-за ошибки", exc_info=False)
\ No newline at end of file
+            self.logger.critical(f"Парсинг был досрочно завершён из-за ошибки", exc_info=False)
+
+    async def filter_stored(
+        self,
+        author_names: Annotated[Optional[list[str]], "Авторы манги"]=[],
+        translator_names: Annotated[Optional[list[str]], "Переводчики манги"]=[],
+        include_tags: Annotated[Optional[list[str]], "Обязательные теги"]=[],
+        except_tags: Annotated[Optional[list[str]], "Исключить мангу с тегами"]=[],
+        types: Annotated[Optional[list[str]], "Типы манги (Манга, Манхва, ...)"]=[],
+    ) -> dict:
+        """
+        Отбор уже сохранённой манги по фильтрам, без парсинга источников
+        
+        Параметры:
+        - author_names: Optional[list[str]]: Авторы манги, default=[],
+        - translator_names: Optional[list[str]]: Переводчики манги, default=[],
+        - include_tags: Optional[list[str]]: Обязательные теги, default=[],
+        - except_tags: Optional[list[str]]: Исключить мангу с тегами, default=[],
+        - types: Optional[list[str]]: Типы манги (Манга, Манхва, ...), default=[],
+        """
+        result = await self._comix_service.filter_stored(
+            author_names = author_names,
+            translator_names = translator_names,
+            include_tags = include_tags,
+            except_tags = except_tags,
+            types = types,
+        )
+        for title in result["titles"]:
+            print(title)
+        self.logger.info(f"Проверено сохранённых работ: {result['checked_works']}, прошло фильтр: {len(result['titles'])}")
+        return result
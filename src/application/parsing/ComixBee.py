@@ -1,13 +1,20 @@
+import asyncio
+import itertools
 import uuid
 import logging
-from typing import Annotated, Any, AsyncGenerator, Optional
+from datetime import date, datetime
+from typing import Annotated, Any, AsyncGenerator, Awaitable, Callable, Optional, Union
 
-from application.parsing.exceptions import ParsingException
+from application.parsing.exceptions import InvalidHTMLPage, PageNotFound, ParsingException
 from application.parsing.parser.Parser import Parser
+from application.parsing.parser.ParsingExecutor import ParsingExecutor
 from application.parsing.requester.RequestDirector import RequestDirector
 from application.parsing.requester.UrlBuilders.UrlBuilder import UrlBuilder
+from application.parsing.requester.UrlBuilders.UrlTemplateLearner import UrlTemplateLearner
 from domain.filters.CFilterBuilder import CFilterBuilder
+from domain.extentions.date import to_date
 from domain.filters.CFilterPipeline import CFilterPipeline
+from domain.filters.Filter import names
 
 class ComixBee:
     def __init__(
@@ -16,51 +23,286 @@ class ComixBee:
         comix_parser: Parser,
         url_builder: UrlBuilder,       
         cfilter_builder: CFilterBuilder,
+        page_concurrency: int = 1,
+        card_concurrency: int = 1,
+        parsing_executor: Optional[ParsingExecutor] = None,
+        url_template_learner: Optional[UrlTemplateLearner] = None,
     ):
         self._request_director = request_director
         self._comix_parser = comix_parser       
+        self._parsing = parsing_executor or ParsingExecutor(comix_parser)
         self._url_builder = url_builder       
         self._cfilter_builder = cfilter_builder
+        self._url_template_learner = url_template_learner
+        self._filter_pipeline: Optional[CFilterPipeline] = None
+        # Как прошёл последний обход каталога: с какой страницы он начался, какие страницы пропущены
+        # из-за ошибок разбора и чем закончился (stopped_by: None — обход прерван исключением)
+        self.last_crawl: dict[str, Any] = {}
+        self._page_concurrency = max(1, int(page_concurrency))
+        self._card_concurrency = max(1, int(card_concurrency))
         self.logger = logging.getLogger(self.__class__.__name__)    
+        self._request_director.add_base_listener(self._on_base_changed)
+    
+    def _on_base_changed(self, base: str):
+        """RequestDirector сменил рабочее зеркало — новые ссылки строятся уже от него"""
+        self._url_builder.base = base
         
     async def parse(
         self,
         start_page: Annotated[Optional[int], "Номер стартовой страницы"]=0,
         end_page: Annotated[Optional[int], "Номер конечной страницы"]=None,
-        filter_pipeline = CFilterBuilder
+        filter_pipeline = CFilterBuilder,
+        should_stop: Optional[Callable[[list[dict[str, Any]]], Awaitable[bool]]] = None,
+        start_date: Optional[Union[date, datetime]] = None,
+        end_date: Optional[Union[date, datetime]] = None,
     ) -> AsyncGenerator[Any, Any]:
+        """
+        Обходит страницы каталога, держа в работе до page_concurrency страниц одновременно.
+        Карточки отдаются строго в порядке номеров страниц.
+
+        :param end_page: последняя страница; None — до первой пустой страницы каталога
+        :param should_stop: получает все карточки очередной страницы (до фильтрации) и решает,
+                            нужно ли после неё прекратить обход
+        :param start_date: каталог отсортирован от новых к старым, поэтому обход прекращается
+                           после страницы, все карточки которой загружены раньше start_date
+        :param end_date: обход начинается с первой страницы, на которой есть карточки не новее end_date
+
+        После обхода last_crawl['stopped_by'] — причина остановки: 'should_stop', 'start_date',
+        'catalog_end' (пустая страница) или 'end_page'.
+        """
+        self.last_crawl = {'start_page': start_page, 'skipped_pages': [], 'stopped_by': None}
         await self._request_director.initialize()
-        self._url_builder.base = self._request_director.base
-        for page_number in range(start_page, end_page+1):
-            await self._request_director.open()
+        start_date, end_date = to_date(start_date), to_date(end_date)
+        filter_pipeline = self._filter_pipeline = await self._push_down_filter(filter_pipeline, start_page)
+        self.last_crawl['catalog_filter'] = self._url_builder.catalog_filter
+        if end_date:
+            start_page = self.last_crawl['start_page'] = await self._find_start_page(start_page, end_date, end_page)
+        if end_page is None:
+            page_range = itertools.count(start_page)
+        else:
+            page_range = range(start_page, end_page+1)
+        page_numbers = iter(page_range)
+        pending: dict[int, asyncio.Task] = {}
+        
+        def schedule():
+            while len(pending) < self._page_concurrency:
+                page_number = next(page_numbers, None)
+                if page_number is None:
+                    return
+                pending[page_number] = asyncio.create_task(self._parse_collection_page(page_number, filter_pipeline))
+        
+        try:
+            page_number = start_page
+            while True:
+                schedule()
+                if page_number not in pending:
+                    self.last_crawl['stopped_by'] = 'end_page'
+                    break
+                try:
+                    cards, filtered_cards = await pending.pop(page_number)
+                    stopped_by = None
+                    if should_stop is not None and await should_stop(cards):
+                        stopped_by = 'should_stop'
+                    elif self._older_than(cards, start_date):
+                        stopped_by = 'start_date'
+                    yield filtered_cards            
+                except ParsingException as ex:
+                    self.last_crawl['skipped_pages'].append(page_number)
+                    page_number += 1
+                    continue
+                except Exception as ex:
+                    await self._request_director.close()
+                    raise ex
+                if stopped_by:
+                    self.logger.info(f"Обход каталога остановлен на странице {page_number}: дальше карточки уже известны или старше start_date")
+                    self.last_crawl['stopped_by'] = stopped_by
+                    break
+                if end_page is None and not cards:
+                    self.logger.info(f"Страница {page_number} пуста, каталог закончился")
+                    self.last_crawl['stopped_by'] = 'catalog_end'
+                    break
+                page_number += 1
+        finally:
+            for task in pending.values():
+                task.cancel()
+            await asyncio.gather(*pending.values(), return_exceptions=True)
+            
+    async def _push_down_filter(self, filter_pipeline: CFilterPipeline, start_page: int) -> CFilterPipeline:
+        """
+        Если сайт умеет сам фильтровать каталог по одному из фильтров, обход идёт по отфильтрованному каталогу,
+        а локально проверяются только остальные фильтры. Первая страница такого каталога проверяется:
+        при 404, если она пуста или на ней есть карточки без нужного значения, обходится полный каталог.
+        """
+        self._url_builder.catalog_filter = None
+        if any(f.field in self._url_builder.LEARNED_FILTER_FIELDS for f in filter_pipeline.filters):
+            # Адреса отфильтрованного каталога для таких полей известны только по ссылкам на карточках;
+            # страница полного каталога попадёт в HTTP кэш и при обходе без фильтра на сайте повторно не скачается
             try:
-                self.logger.info(f"Производится парсинг страницы {page_number}")
-                source_url = self._url_builder.get_collection_page_url(page_number) 
-                response_content = await self._request_director.get(source_url)
-                cards = self._comix_parser.parse_collection_page(response_content)
-                self.logger.info(f"Обнаружено карточек манги {len(cards)}")
-                filtered_cards = self._filter_manga_list(filter_pipeline, cards)
-                self.logger.info(f"Отфильтровано карточек {len(cards) - len(filtered_cards)}")
-                self.logger.info(f"Парсинг карточек со страницы страницы {page_number} завершён")
-                yield filtered_cards            
-            except ParsingException as ex:
-                continue
-            except Exception as ex:
-                await self._request_director.close()
-                raise ex
+                source_url = self._url_builder.get_collection_page_url(start_page)
+                self._url_builder.observe_cards(
+                    await self._parsing.parse_collection_page(await self._request_director.get(source_url))
+                )
+            except (PageNotFound, ParsingException, InvalidHTMLPage):
+                pass
+        pushed, local_pipeline = self._cfilter_builder.split(filter_pipeline, self._url_builder.catalog_path)
+        if pushed is None:
+            return filter_pipeline
+        cfilter, value = pushed
+        self._url_builder.catalog_filter = (cfilter.field, value)
+        source_url = self._url_builder.get_collection_page_url(start_page)
+        try:
+            cards = await self._parsing.parse_collection_page(await self._request_director.get(source_url))
+        except (PageNotFound, ParsingException, InvalidHTMLPage):
+            cards = None
+        if not cards or not all(value in names(card.get(cfilter.field) or []) for card in cards):
+            self.logger.warning(f"Сайт не отфильтровал каталог по {cfilter.field} = {value}, обходится полный каталог")
+            self._url_builder.catalog_filter = None
+            return filter_pipeline
+        self.logger.info(f"Каталог фильтруется на стороне сайта по {cfilter.field} = {value}: {source_url}")
+        return local_pipeline
+    
+    def _upload_dates(self, cards: list[dict[str, Any]]) -> list[date]:
+        return [card['upload_date'] for card in cards if card.get('upload_date')]
+    
+    def _older_than(self, cards: list[dict[str, Any]], start_date: Optional[date]) -> bool:
+        """Все карточки страницы с известной датой загружены раньше start_date"""
+        dates = self._upload_dates(cards)
+        return bool(start_date and dates and max(dates) < start_date)
+    
+    async def _is_newer_than(self, page_number: int, end_date: date) -> bool:
+        """Все карточки страницы загружены позже end_date. Страницы без дат считаются подходящими"""
+        source_url = self._url_builder.get_collection_page_url(page_number)
+        try:
+            cards = await self._parsing.parse_collection_page(await self._request_director.get(source_url))
+        except (ParsingException, InvalidHTMLPage):
+            return False
+        except ConnectionError as ex:
+            # В том числе PageNotFound: страницы за концом каталога нет, искать дальше незачем
+            self.logger.info(f"Страница {page_number} недоступна ({ex}), она считается не новее {end_date}")
+            return False
+        dates = self._upload_dates(cards)
+        return bool(dates) and min(dates) > end_date
+    
+    async def _find_start_page(self, start_page: int, end_date: date, end_page: Optional[int]) -> int:
+        """
+        Находит первую страницу, на которой есть карточки не новее end_date:
+        сначала шагами удваивающейся длины, затем бинарным поиском между последними двумя шагами.
+        Просмотренные страницы попадают в HTTP кэш, поэтому сам обход их повторно не скачивает.
+        """
+        if not await self._is_newer_than(start_page, end_date):
+            return start_page
+        # Все страницы до low новее end_date, страница high — уже нет (или это конец диапазона)
+        low, step = start_page, 1
+        high = start_page + step
+        while (end_page is None or high < end_page) and await self._is_newer_than(high, end_date):
+            low, step = high, step * 2
+            high = start_page + step
+        if end_page is not None:
+            high = min(high, end_page)
+        while high - low > 1:
+            middle = (low + high) // 2
+            if await self._is_newer_than(middle, end_date):
+                low = middle
+            else:
+                high = middle
+        self.logger.info(f"Карточки не новее {end_date} начинаются со страницы {high}")
+        return high
+    
+    async def _parse_collection_page(
+        self,
+        page_number: int,
+        filter_pipeline: CFilterPipeline,
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        """Возвращает все карточки страницы и прошедшие фильтр"""
+        self.logger.info(f"Производится парсинг страницы {page_number}")
+        source_url = self._url_builder.get_collection_page_url(page_number) 
+        response_content = await self._request_director.get(source_url)
+        cards = await self._parsing.parse_collection_page(response_content)
+        self.logger.info(f"Обнаружено карточек манги {len(cards)}")
+        filtered_cards = self._filter_manga_list(filter_pipeline, cards)
+        self.logger.info(f"Отфильтровано карточек {len(cards) - len(filtered_cards)}")
+        self.logger.info(f"Парсинг карточек со страницы страницы {page_number} завершён")
+        return cards, filtered_cards
             
     async def parse_card(self, cards: dict[str, Any]) -> AsyncGenerator[Any, Any]:
-        for card in cards:
-            try:
-                response_text = await self._request_director.get(self._url_builder.build_url(card["page_url"]))
-                card['download_page_url'] = self._comix_parser.parse_manga_page(response_text)
-                response_text = await self._request_director.get(self._url_builder.build_url(card["download_page_url"]))
-                files = self._comix_parser.parse_download_page(response_text)
-                files = await self._download_card_files(files)
-                card['files'] = files                         
-                yield card
-            except ParsingException as ex:
-                raise ex  
+        """
+        Обрабатывает карточки параллельно (не более card_concurrency одновременно)
+        и отдаёт каждую карточку сразу после завершения её обработки.
+        Карточка, которую не удалось разобрать или скачать, пропускается с предупреждением,
+        не прерывая обработку остальных (в том числе уже идущие загрузки).
+        """
+        semaphore = asyncio.Semaphore(self._card_concurrency)
+        
+        async def worker(card: dict[str, Any]) -> Optional[dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await self._parse_single_card(card)
+                except (ParsingException, InvalidHTMLPage, ConnectionError) as ex:
+                    self.logger.warning(f"Карточка {card.get('page_url')} пропущена: {ex}")
+                    return None
+        
+        tasks = [asyncio.create_task(worker(card)) for card in cards]
+        try:
+            for next_card in asyncio.as_completed(tasks):
+                parsed_card = await next_card
+                if parsed_card is not None:
+                    yield parsed_card
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _parse_single_card(self, card: dict[str, Any]) -> dict[str, Any]:
+        page_url = self._url_builder.build_url(card["page_url"])
+        files = await self._parse_predicted_download_page(card, page_url)
+        if files is None:
+            response_text = await self._request_director.get(page_url)
+            card['download_page_url'] = await self._parsing.parse_manga_page(response_text)
+            download_page_url = self._url_builder.build_url(card["download_page_url"])
+            if self._url_template_learner:
+                self._url_template_learner.observe(page_url, download_page_url)
+            response_text = await self._request_director.get(download_page_url)
+            files = await self._parsing.parse_download_page(response_text)
+        files = await self._download_card_files(files)
+        card['files'] = files                         
+        return card
+                                    
+    async def _parse_predicted_download_page(self, card: dict[str, Any], page_url: str) -> Optional[list[dict[str, str]]]:
+        """
+        Разбирает страницу загрузок по ссылке, выведенной из ссылки на страницу манги, минуя саму страницу манги.
+        None — предсказания нет или оно не подошло, и ссылку нужно брать со страницы манги;
+        полученная оттуда ссылка заодно покажет шаблону, ошибся ли он.
+        """
+        if not self._url_template_learner:
+            return None
+        download_page_url = self._url_template_learner.predict(page_url)
+        if not download_page_url:
+            return None
+        try:
+            files = await self._parsing.parse_download_page(await self._request_director.get(download_page_url))
+        except (PageNotFound, ParsingException):
+            self.logger.info(f"Предсказанная страница загрузок {download_page_url} не подошла, ссылка берётся со страницы манги")
+            return None
+        if not files:
+            # Пустая страница может оказаться заглушкой вместо 404; при повторе она возьмётся из HTTP кэша
+            return None
+        card['download_page_url'] = download_page_url
+        return files
+                                    
+    async def close(self):
+        await self._request_director.close()
+        self._parsing.close()
+                                    
+    def statistics(self) -> dict[str, Any]:
+        statistics = self._request_director.statistics()
+        if self._filter_pipeline is not None and self._filter_pipeline.filters:
+            statistics['filters'] = self._filter_pipeline.statistics()
+        if self._url_builder.catalog_filter:
+            statistics['catalog_filter'] = dict(zip(('field', 'value'), self._url_builder.catalog_filter))
+        if self._url_template_learner:
+            statistics['download_url_prediction'] = self._url_template_learner.snapshot()
+        return statistics
                                     
     def _filter_manga_list(
         self,
@@ -71,12 +313,14 @@ class ComixBee:
         return [value for value, mask in zip(cards, mask) if mask]
     
     async def _download_card_files(self, files: list[dict[str, str]]):
-        for file in files:
-            try:
-                file['save_path'] = await self._request_director.download(file['url'], str(uuid.uuid4()))
-            except Exception:
-                self.logger.warning(f"Ошибка при скачивании файла для ссылки {file['url']}", exc_info=False)
-                self.logger.warning("Пропуск загрузки карточки", exc_info=False)
-                file['save_path'] = ''
-                continue
-        return files        
\ No newline at end of file
+        await asyncio.gather(*(self._download_card_file(file) for file in files))
+        return files
+    
+    async def _download_card_file(self, file: dict[str, str]):
+        try:
+            # Имя зависит только от ссылки, чтобы прерванная загрузка продолжилась и после перезапуска
+            file['save_path'] = await self._request_director.download(file['url'], str(uuid.uuid5(uuid.NAMESPACE_URL, file['url'])))
+        except Exception:
+            self.logger.warning(f"Ошибка при скачивании файла для ссылки {file['url']}", exc_info=False)
+            self.logger.warning("Пропуск загрузки карточки", exc_info=False)
+            file['save_path'] = ''
@@ -11,6 +11,7 @@ class ParsingException(BaseException):
         fields: list[str]=[],
     ):
         self.page_type = page_type
+        self.fields = fields
         if fields:
             field_str = ""
             for i, field in enumerate(fields):
@@ -23,9 +24,20 @@ class ParsingException(BaseException):
             message = f"Страница типа {page_type} не была спаршена"
         super().__init__(message)
         self.msgfmt = message
+    
+    def __reduce__(self):
+        # Исключение пересекает границу процесса при разборе страниц в пуле процессов
+        return (self.__class__, (self.page_type, self.fields))
         
         
 class NoOneAvailableDomen(BaseException):
     def __init__(self, message="Нет доступных доменов указанного ресурса!"):
         super().__init__(message)
-        self.msgfmt = message
\ No newline at end of file
+        self.msgfmt = message
+
+class PageNotFound(ConnectionError):
+    """Сервер ответил 404/410: повторять запрос бессмысленно, и зеркало при этом исправно"""
+    def __init__(self, url: str, status: int = 404):
+        super().__init__(f"Страница {url} не найдена ({status})")
+        self.url = url
+        self.status = status
@@ -1,15 +1,22 @@
 import logging
 import re
 from typing import Any, Dict
-from bs4 import BeautifulSoup
 
 from application.parsing.exceptions import InvalidHTMLPage, ParsingException
 from application.parsing.parser.Parser import Parser
+from application.parsing.parser.backends.factory import create_backend
 from domain.enums import PageType
+from domain.extentions.date import find_date
 
 class HMangaParser(Parser):        
-    def __init__(self):
+    def __init__(self, backend: str = "soup", scoped: bool = True):
+        """
+        :param backend: построитель DOM: "soup" (BeautifulSoup) или "lxml"
+        :param scoped: на страницах манги и загрузок разбирать только нужный элемент
+        """
         self.logger = logging.getLogger(self.__class__.__name__)
+        self._backend = create_backend(backend)
+        self.scoped = scoped
     
     def parse_collection_page(self, html_content: str) -> list[dict[str, Any]]:
         """
@@ -25,9 +32,10 @@ class HMangaParser(Parser):
         - authors: list[tuple[str, str]]: список авторов и их ссылок
         - tags: list[str]: список тегов
         - description: str: описание манги
+        - upload_date: Optional[date]: дата загрузки
         """
         self.logger.info(f"Начало парсинга HTML страницы коллекции манги")
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = self._backend.parse(html_content)
         content = soup.find('div', id='content')
         
         if not content:
@@ -70,6 +78,10 @@ class HMangaParser(Parser):
                     if b_tag:
                         description = b_tag.next_sibling.strip()
                                                     
+                # Дата загрузки
+                date_div = row.find('div', class_='row4_right') or row
+                upload_date = find_date(date_div.get_text(" ", strip=True))
+                                                    
                 chapter_number = 1          
                 manga_list.append({
                     'title': title,
@@ -81,7 +93,8 @@ class HMangaParser(Parser):
                     'translators': translators,                                        
                     'series': series,
                     'description': description,
-                    'chapter_number': chapter_number
+                    'chapter_number': chapter_number,
+                    'upload_date': upload_date
                 })
             except AttributeError as ex:
                 self.logger.warning(f"Во время парсинга карточки манги была обнаружена ошибка, пропуск записи")
@@ -100,7 +113,7 @@ class HMangaParser(Parser):
         - download_page_url: str: ссылка на страницу со ссылками на загрузки манги
         """
         self.logger.info(f"Начало поиска на страницы манги ссылки на страницу с загрузками")
-        soup = BeautifulSoup(html_content, 'html.parser')      
+        soup = self._backend.parse(self._scope(html_content, 'div', 'class', 'extaraNavi'))
         try:
             download_page_url = soup.find("div", class_="extaraNavi").find_all("p", class_="extra_off")[1].find("a").get("href")
             self.logger.info(f"Была обнаружена ссылка на страницу {download_page_url}")
@@ -125,7 +138,7 @@ class HMangaParser(Parser):
             ]
         }
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = self._backend.parse(self._scope(html_content, 'table', 'id', 'download_table'))
         files = []
         
         # Находим таблицу загрузок
@@ -1,18 +1,25 @@
 import re
 import logging
 
-from bs4 import BeautifulSoup
 from typing import Any, List, Dict, Optional
 
 from application.parsing.exceptions import InvalidHTMLPage, ParsingException
 from application.parsing.parser.Parser import Parser
+from application.parsing.parser.backends.factory import create_backend
 from domain.enums import PageType
+from domain.extentions.date import find_date
 
 CHAPTER_RE = re.compile(r'ch(\d+(?:\.\d+)?)', flags=re.IGNORECASE)
 
 class MangaChanParser(Parser):
-    def __init__(self):
+    def __init__(self, backend: str = "soup", scoped: bool = True):
+        """
+        :param backend: построитель DOM: "soup" (BeautifulSoup) или "lxml"
+        :param scoped: на страницах манги и загрузок разбирать только нужный элемент
+        """
         self.logger = logging.getLogger(self.__class__.__name__)
+        self._backend = create_backend(backend)
+        self.scoped = scoped
 
     def parse_collection_page(self, html_content: str) -> List[Dict[str, Any]]:
         """
@@ -22,13 +29,15 @@ class MangaChanParser(Parser):
         {
             'title': str,
             'type': Optional[str],
+            'type_url': Optional[str],
             'authors': List[{'name': str, 'url': Optional[str]}],
             'tags': List[str],
-            'page_url': str
+            'page_url': str,
+            'upload_date': Optional[date]
         }
         """
         self.logger.info("Начало парсинга страницы каталога манги")
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = self._backend.parse(html_content)
         content = soup.find(id='content')
         if not content:
             raise InvalidHTMLPage()
@@ -51,6 +60,7 @@ class MangaChanParser(Parser):
                 # Тип (в блоке manga_row1 есть ссылка на /type/...)
                 type_tag = row.select_one('.manga_row1 a[href^="/type/"]')
                 mtype = type_tag.get_text(strip=True) if type_tag else None
+                type_url = type_tag.get('href') if type_tag else None
 
                 # Авторы — в .manga_row2 .row3_left a
                 authors: List[Dict[str, Optional[str]]] = []
@@ -71,12 +81,18 @@ class MangaChanParser(Parser):
                         if txt:
                             tags.append({'name': txt})
 
+                # Дата загрузки — в .row4_right, иначе ищем первую дату в карточке
+                date_container = row.select_one('.row4_right') or row
+                upload_date = find_date(date_container.get_text(" ", strip=True))
+
                 result.append({
                     'title': title,
                     'type': mtype,
+                    'type_url': type_url,
                     'authors': authors,
                     'tags': tags,
-                    'page_url': page_url
+                    'page_url': page_url,
+                    'upload_date': upload_date
                 })
             except Exception as exc:
                 self.logger.warning(f"Ошибка при парсинге карточки: {exc}. Пропускаю запись.")
@@ -90,7 +106,7 @@ class MangaChanParser(Parser):
         Возвращает URL страницы загрузок или поднимает ParsingException.
         """
         self.logger.info("Поиск ссылки на страницу 'Скачать' в карточке манги")
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = self._backend.parse(self._scope(html_content, 'div', 'class', 'extaraNavi'))
         try:
             nav = soup.find("div", class_="extaraNavi")
             if not nav:
@@ -122,7 +138,7 @@ class MangaChanParser(Parser):
         }
         """
         self.logger.info("Парсинг страницы загрузок")
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = self._backend.parse(self._scope(html_content, 'table', 'id', 'download_table'))
 
         table = soup.find(id='download_table')
         if not table:
@@ -1,7 +1,16 @@
 import abc
 from typing import Any
 
+from application.parsing.parser.scoping import extract_element
+
 class Parser:        
+    # Разбирать только нужный элемент страницы, а не строить DOM целиком
+    scoped: bool = True
+
+    def _scope(self, html_content: str, tag: str, attr: str, value: str) -> str:
+        if not self.scoped:
+            return html_content
+        return extract_element(html_content, tag, attr, value) or html_content
 
     @abc.abstractmethod
     def parse_collection_page(self, html_content: str) -> list[dict[str, Any]]:
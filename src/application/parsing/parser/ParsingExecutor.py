@@ -0,0 +1,77 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Optional
+
+from application.parsing.parser.Parser import Parser
+
+# Парсер, переданный процессу пула при его запуске; так он не пересылается с каждой страницей
+_worker_parser: Optional[Parser] = None
+
+def _init_worker(parser: Parser):
+    global _worker_parser
+    _worker_parser = parser
+
+def _parse_in_worker(method: str, html_content: str) -> Any:
+    return getattr(_worker_parser, method)(html_content)
+
+def _parse_with(parser: Parser, method: str, html_content: str) -> Any:
+    return getattr(parser, method)(html_content)
+
+class ParsingExecutor:
+    MODES = ("inline", "thread", "process")
+
+    def __init__(self, parser: Parser, mode: str = "inline", workers: Optional[int] = None):
+        """
+        Выполняет разбор страниц вне цикла событий, чтобы тяжёлые страницы не тормозили загрузки.
+
+        :param parser: парсер источника; в режиме process он должен сериализоваться pickle
+        :param mode: "inline" — прямо в цикле событий, "thread" — в пуле потоков,
+                     "process" — в пуле процессов
+        :param workers: размер пула; по умолчанию — число ядер процессора
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Неизвестный режим разбора страниц: {mode}")
+        self.parser = parser
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self._executor: Optional[Executor] = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_worker,
+                    initargs=(self.parser,),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="parsing")
+            self.logger.info(f"Запущен пул разбора страниц: {self.mode}, {self.workers} исполнителей")
+        return self._executor
+
+    async def run(self, method: str, html_content: str) -> Any:
+        """Вызывает метод парсера (parse_collection_page и т.п.) для страницы и возвращает его результат"""
+        if self.mode == "inline":
+            return _parse_with(self.parser, method, html_content)
+        loop = asyncio.get_running_loop()
+        if self.mode == "process":
+            return await loop.run_in_executor(self._get_executor(), _parse_in_worker, method, html_content)
+        return await loop.run_in_executor(self._get_executor(), _parse_with, self.parser, method, html_content)
+
+    async def parse_collection_page(self, html_content: str) -> list[dict[str, Any]]:
+        return await self.run('parse_collection_page', html_content)
+
+    async def parse_manga_page(self, html_content: str) -> str:
+        return await self.run('parse_manga_page', html_content)
+
+    async def parse_download_page(self, html_content: str) -> list[dict[str, str]]:
+        return await self.run('parse_download_page', html_content)
+
+    def close(self):
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
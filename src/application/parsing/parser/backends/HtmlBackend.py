@@ -0,0 +1,14 @@
+import abc
+from typing import Any
+
+class HtmlBackend:
+    """
+    Построитель DOM для парсеров. parse возвращает корень документа с интерфейсом
+    BeautifulSoup в том объёме, который используют парсеры:
+    find, find_all, select_one, get_text, get, [], .text, next_sibling.
+    """
+    name: str = ""
+
+    @abc.abstractmethod
+    def parse(self, html_content: str) -> Any:
+        pass
@@ -0,0 +1,142 @@
+from typing import Any, Iterator, Optional, Union
+
+from lxml import etree, html
+from lxml.cssselect import CSSSelector
+
+from application.parsing.parser.backends.HtmlBackend import HtmlBackend
+
+# Текст этих элементов BeautifulSoup не включает в get_text
+SKIPPED_TEXT_TAGS = frozenset(('script', 'style', 'template'))
+
+_xpath_cache: dict[tuple, etree.XPath] = {}
+_css_cache: dict[str, CSSSelector] = {}
+
+def _compile_xpath(name: Optional[str], attrs: dict[str, Any]) -> tuple[etree.XPath, dict[str, str]]:
+    """
+    Переводит условия поиска BeautifulSoup (имя тега, class_, id, attrs) в XPath.
+    Значения атрибутов передаются XPath-переменными, поэтому скомпилированное выражение
+    переиспользуется для любых значений.
+    """
+    conditions = []
+    variables = {}
+    for i, (attr, value) in enumerate(sorted(attrs.items())):
+        if value is True:
+            conditions.append(f"@{attr}")
+        elif attr == 'class':
+            variables[f"v{i}"] = f" {value} "
+            conditions.append(f"contains(concat(' ', normalize-space(@class), ' '), $v{i})")
+        else:
+            variables[f"v{i}"] = str(value)
+            conditions.append(f"@{attr}=$v{i}")
+    key = (name, tuple((attr, value is True) for attr, value in sorted(attrs.items())))
+    xpath = _xpath_cache.get(key)
+    if xpath is None:
+        expression = f".//{name or '*'}" + "".join(f"[{condition}]" for condition in conditions)
+        xpath = _xpath_cache[key] = etree.XPath(expression)
+    return xpath, variables
+
+def _iter_strings(element: etree._Element) -> Iterator[str]:
+    if element.text:
+        yield element.text
+    for child in element:
+        if isinstance(child.tag, str) and child.tag not in SKIPPED_TEXT_TAGS:
+            yield from _iter_strings(child)
+        if child.tail:
+            yield child.tail
+
+def _single_string(element: etree._Element) -> Optional[str]:
+    """Аналог Tag.string: единственная строка внутри тега или None"""
+    children = len(element)
+    if children == 0:
+        return element.text
+    if children == 1 and not element.text and not element[0].tail and isinstance(element[0].tag, str):
+        return _single_string(element[0])
+    return None
+
+class LxmlNode:
+    """Обёртка над элементом lxml с интерфейсом тега BeautifulSoup, которым пользуются парсеры"""
+    __slots__ = ('_element',)
+
+    def __init__(self, element: etree._Element):
+        self._element = element
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __repr__(self) -> str:
+        return f"<LxmlNode {self._element.tag}>"
+
+    @property
+    def name(self) -> str:
+        return self._element.tag
+
+    def _search(self, name: Optional[str], attrs: Optional[dict[str, Any]], string: Optional[str], kwargs: dict[str, Any]) -> Iterator["LxmlNode"]:
+        conditions = dict(attrs or {})
+        if 'class_' in kwargs:
+            kwargs['class'] = kwargs.pop('class_')
+        conditions.update(kwargs)
+        xpath, variables = _compile_xpath(name, conditions)
+        for element in xpath(self._element, **variables):
+            if string is not None and _single_string(element) != string:
+                continue
+            yield LxmlNode(element)
+
+    def find(self, name: Optional[str] = None, attrs: Optional[dict[str, Any]] = None, string: Optional[str] = None, **kwargs) -> Optional["LxmlNode"]:
+        return next(self._search(name, attrs, string, kwargs), None)
+
+    def find_all(self, name: Optional[str] = None, attrs: Optional[dict[str, Any]] = None, string: Optional[str] = None, **kwargs) -> list["LxmlNode"]:
+        return list(self._search(name, attrs, string, kwargs))
+
+    def select(self, selector: str) -> list["LxmlNode"]:
+        css = _css_cache.get(selector)
+        if css is None:
+            css = _css_cache[selector] = CSSSelector(selector, translator='html')
+        return [LxmlNode(element) for element in css(self._element) if element is not self._element]
+
+    def select_one(self, selector: str) -> Optional["LxmlNode"]:
+        found = self.select(selector)
+        return found[0] if found else None
+
+    def get_text(self, separator: str = "", strip: bool = False) -> str:
+        strings = _iter_strings(self._element)
+        if strip:
+            strings = (string.strip() for string in strings)
+            strings = (string for string in strings if string)
+        return separator.join(strings)
+
+    @property
+    def text(self) -> str:
+        return self.get_text()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._element.get(key)
+        if value is None:
+            return default
+        # BeautifulSoup отдаёт class списком классов
+        return value.split() if key == 'class' else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    @property
+    def next_sibling(self) -> Union[str, "LxmlNode", None]:
+        if self._element.tail is not None:
+            return self._element.tail
+        sibling = self._element.getnext()
+        return LxmlNode(sibling) if sibling is not None else None
+
+class LxmlBackend(HtmlBackend):
+    name = "lxml"
+
+    def parse(self, html_content: str) -> LxmlNode:
+        try:
+            root = html.document_fromstring(html_content)
+        except ValueError:
+            # Строки с объявлением кодировки (<?xml encoding=...?>) lxml принимает только байтами
+            root = html.document_fromstring(html_content.encode('utf-8'))
+        except etree.ParserError:
+            root = html.Element('html')
+        return LxmlNode(root)
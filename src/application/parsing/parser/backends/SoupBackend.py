@@ -0,0 +1,9 @@
+from bs4 import BeautifulSoup
+
+from application.parsing.parser.backends.HtmlBackend import HtmlBackend
+
+class SoupBackend(HtmlBackend):
+    name = "soup"
+
+    def parse(self, html_content: str) -> BeautifulSoup:
+        return BeautifulSoup(html_content, 'html.parser')
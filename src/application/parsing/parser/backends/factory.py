@@ -0,0 +1,22 @@
+import logging
+
+from application.parsing.parser.backends.HtmlBackend import HtmlBackend
+from application.parsing.parser.backends.SoupBackend import SoupBackend
+
+logger = logging.getLogger(__name__)
+
+def create_backend(name: str = "soup") -> HtmlBackend:
+    """
+    Возвращает построитель DOM по имени: "soup" (BeautifulSoup + html.parser) или "lxml".
+    Если lxml не установлен, используется BeautifulSoup.
+    """
+    if name == SoupBackend.name:
+        return SoupBackend()
+    if name == "lxml":
+        try:
+            from application.parsing.parser.backends.LxmlBackend import LxmlBackend
+        except ImportError as ex:
+            logger.warning(f"Бэкенд lxml недоступен ({ex}), используется BeautifulSoup")
+            return SoupBackend()
+        return LxmlBackend()
+    raise ValueError(f"Неизвестный бэкенд парсинга HTML: {name}")
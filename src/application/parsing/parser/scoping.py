@@ -0,0 +1,56 @@
+import re
+from typing import Optional
+
+# Комментарии и содержимое script/style: теги внутри них — текст, а не разметка страницы
+_SKIPPED = r"<!--.*?(?:-->|\Z)|<(?:script|style)\b[^>]*>.*?(?:</(?:script|style)\s*>|\Z)"
+_ATTRIBUTE = re.compile(r"""([^\s=/>"']+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s>"']+))?""")
+
+_scanner_cache: dict[str, re.Pattern] = {}
+
+def _scanner(tag: str) -> re.Pattern:
+    """Находит открывающие и закрывающие теги tag, перескакивая комментарии, script и style"""
+    scanner = _scanner_cache.get(tag)
+    if scanner is None:
+        scanner = _scanner_cache[tag] = re.compile(
+            rf"""{_SKIPPED}|<(?P<closing>/?){tag}(?P<attributes>(?:\s(?:[^>"']|"[^"]*"|'[^']*')*)?)/?>""",
+            flags=re.IGNORECASE | re.DOTALL,
+        )
+    return scanner
+
+def _has_attribute(attributes: str, attr: str, value: str) -> bool:
+    for name, raw_value in _ATTRIBUTE.findall(attributes):
+        if name.lower() != attr:
+            continue
+        if raw_value[:1] in ('"', "'"):
+            raw_value = raw_value[1:-1]
+        # Первое вхождение атрибута — то, которое видит HTML-парсер
+        return value in raw_value.split() if attr == 'class' else raw_value == value
+    return False
+
+def extract_element(html_content: str, tag: str, attr: str, value: str) -> Optional[str]:
+    """
+    Вырезает из страницы первый элемент <tag attr="value"> вместе с содержимым,
+    не строя DOM для остальной страницы. Для attr="class" value ищется среди классов элемента,
+    разделённых пробелами, как это делает find(class_=...).
+    Теги внутри комментариев, script и style не учитываются.
+    Закрывающий тег находится подсчётом вложенных тегов того же имени.
+    Возвращает None, если элемент не найден — тогда страницу нужно разбирать целиком.
+    """
+    tag, attr = tag.lower(), attr.lower()
+    matches = _scanner(tag).finditer(html_content)
+    for match in matches:
+        if match.group('closing') == '' and _has_attribute(match.group('attributes'), attr, value):
+            start = match.start()
+            break
+    else:
+        return None
+
+    depth = 1
+    for tag_match in matches:
+        if tag_match.group('closing') is None:
+            continue
+        depth += -1 if tag_match.group('closing') else 1
+        if depth == 0:
+            return html_content[start:tag_match.end()]
+    # Незакрытый элемент: отдаём остаток страницы, парсер сам закроет теги
+    return html_content[start:]
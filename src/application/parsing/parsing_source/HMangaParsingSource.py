@@ -2,12 +2,18 @@ import aiohttp
 
 from application.parsing.ComixBee import ComixBee
 from application.parsing.parser.HMangaParser import HMangaParser
+from application.parsing.parser.ParsingExecutor import ParsingExecutor
 from application.parsing.parsing_source.Base import ParsingSourceBase
+from application.parsing.requester.ConcurrencyController import ConcurrencyController
 from application.parsing.requester.ContentDownloader import ContentDownloader
+from application.parsing.requester.ContentStore import ContentStore
 from application.parsing.requester.DomainChecker import DomainChecker
+from application.parsing.requester.HttpCache import HttpCache
+from application.parsing.requester.RateLimiter import RateLimiter
 from application.parsing.requester.RequestDirector import RequestDirector
 from application.parsing.requester.Requester import Requester
 from application.parsing.requester.UrlBuilders.HMangaUrlBuilder import HMangaUrlBuilder
+from application.parsing.requester.UrlBuilders.UrlTemplateLearner import UrlTemplateLearner
 from domain.filters.CFilterBuilder import CFilterBuilder
 
 class HMangaParsingSource(ParsingSourceBase):
@@ -39,6 +45,52 @@ class HMangaParsingSource(ParsingSourceBase):
         "Sec-Fetch-Dest": "document",
         "Cache-Control": "max-age=0",    
     }
+        self.PARSER_BACKEND = "lxml"  # "soup" — BeautifulSoup с html.parser
+        self.PARSING_EXECUTOR = {
+            "mode": "process",  # "inline" — в цикле событий, "thread" — в пуле потоков
+            "workers": None,  # По умолчанию — число ядер процессора
+        }
+        self.PAGE_CONCURRENCY = 2
+        self.CARD_CONCURRENCY = 3
+        self.MAX_DOWNLOADS = 4
+        self.MAX_DOWNLOADS_PER_HOST = 2
+        self.RATE_LIMIT = {
+            "rate": 0.5,  # Запросов в секунду к одному хосту
+            "burst": 3,  # Запросов подряд без ожидания
+            "jitter": 0.5,  # Случайная добавка к ожиданию, сек
+        }
+        self.CONNECTION_POOL = {
+            "connection_limit": 50,  # Общий размер пула соединений
+            "connection_limit_per_host": 8,  # Соединений к одному хосту
+            "dns_cache_ttl": 600,  # Время жизни DNS кэша, сек
+            "keepalive_timeout": 60.0,  # Время жизни простаивающего соединения, сек
+        }
+        self.ADAPTIVE_CONCURRENCY = {
+            "initial_limit": 2,  # Стартовый лимит параллельных запросов к хосту
+            "max_limit": 8,
+            "latency_target": 3.0,  # Целевой p90 времени ответа, сек
+        }
+        self.MIRROR_FAILOVER = {
+            "probe_interval": 300.0,  # Фоновая проверка всех зеркал, сек
+            "error_rate_threshold": 0.3,  # Доля ошибок, после которой зеркало меняется
+            "latency_threshold": 10.0,  # p90 времени ответа, после которого зеркало меняется, сек
+            "health_window": 20,  # По скольким последним запросам считать долю ошибок
+        }
+        self.DOWNLOAD_URL_PREDICTION = {
+            "sample_size": 5,  # Сколько карточек подряд шаблон ссылки на загрузки должен угадать до использования
+            "max_misses": 3,  # После стольких промахов подряд шаблон изучается заново
+        }
+        self.MIRROR_STATE_TTL = 6 * 60 * 60  # Сколько доверять сохранённой проверке зеркал при старте, сек
+        self.HTTP_CACHE = {
+            "ttl_rules": [
+                (r"/manga/newest/", 15 * 60),  # Каталог быстро пополняется новыми карточками
+                (r"/tags/", 15 * 60),  # Каталог, отфильтрованный на стороне сайта
+                (r"/manga/", 24 * 60 * 60),
+                (r"/download/", 6 * 60 * 60),
+            ],
+            "default_ttl": 0,  # Остальное всегда перепроверяется условным запросом
+            "max_size": 512 * 1024 * 1024,
+        }
     
     def build_comix_bee(self,) -> ComixBee:      
         timeout = aiohttp.ClientTimeout(
@@ -47,18 +99,41 @@ class HMangaParsingSource(ParsingSourceBase):
             sock_connect=60.0, 
             sock_read=60.0  
         )
-        requester = Requester()
+        rate_limiter = RateLimiter(**self.RATE_LIMIT)
+        requester = Requester(
+            rate_limiter=rate_limiter,
+            cache=HttpCache(directory=self.destination / ".http_cache", **self.HTTP_CACHE),
+            concurrency=ConcurrencyController(**self.ADAPTIVE_CONCURRENCY),
+        )
         request_director = RequestDirector(
             domains=self.domains,
             requester=requester,
-            domain_checker=DomainChecker(requester=requester, timeout=60),
-            downloader=ContentDownloader(destination_path=self.destination),
+            domain_checker=DomainChecker(
+                requester=requester,
+                timeout=60,
+                state_path=self.destination / ".mirrors.json",
+                state_ttl=self.MIRROR_STATE_TTL,
+            ),
+            downloader=ContentDownloader(
+                destination_path=self.destination,
+                max_concurrent_downloads=self.MAX_DOWNLOADS,
+                max_downloads_per_host=self.MAX_DOWNLOADS_PER_HOST,
+                rate_limiter=rate_limiter,
+                content_store=ContentStore(directory=self.destination / ".store"),
+            ),
             headers=self.DEFAULT_HEADERS,
-            timeout=timeout
+            timeout=timeout,
+            **self.CONNECTION_POOL,
+            **self.MIRROR_FAILOVER,
         )        
+        comix_parser = HMangaParser(backend=self.PARSER_BACKEND)
         return ComixBee(
             request_director=request_director,
-            comix_parser=HMangaParser(),
+            comix_parser=comix_parser,
             url_builder=HMangaUrlBuilder(),
             cfilter_builder=CFilterBuilder(),
+            page_concurrency=self.PAGE_CONCURRENCY,
+            card_concurrency=self.CARD_CONCURRENCY,
+            parsing_executor=ParsingExecutor(comix_parser, **self.PARSING_EXECUTOR),
+            url_template_learner=UrlTemplateLearner(**self.DOWNLOAD_URL_PREDICTION),
         )
\ No newline at end of file
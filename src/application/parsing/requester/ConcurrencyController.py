@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+class HostConcurrency:
+    def __init__(self, limit: float, window: int):
+        self.limit = limit
+        self.in_flight = 0
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.successes = 0
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        self.condition = asyncio.Condition()
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class ConcurrencyController:
+    def __init__(
+        self,
+        initial_limit: int = 2,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        latency_target: float = 3.0,
+        decrease_factor: float = 0.5,
+        window: int = 50,
+        history_size: int = 100,
+    ):
+        """
+        AIMD-регулятор числа одновременных запросов к каждому хосту.
+        Лимит растёт на 1 за каждый «раунд» успешных ответов (limit штук), если p90 задержки
+        не выше latency_target, и умножается на decrease_factor при таймаутах, ответах 429/503
+        или превышении целевой задержки. Retry-After приостанавливает запросы к хосту.
+
+        :param initial_limit: стартовый лимит для нового хоста
+        :param min_limit: нижняя граница лимита
+        :param max_limit: верхняя граница лимита
+        :param latency_target: целевое значение p90 задержки ответа, сек
+        :param decrease_factor: во сколько раз уменьшать лимит при перегрузке
+        :param window: сколько последних задержек учитывать при расчёте перцентилей
+        :param history_size: сколько последних изменений лимитов хранить для отчёта
+        """
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.window = window
+        self._hosts: dict[str, HostConcurrency] = {}
+        self.history: deque[dict[str, Any]] = deque(maxlen=history_size)
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _state(self, host: str) -> HostConcurrency:
+        if host not in self._hosts:
+            self._hosts[host] = HostConcurrency(self.initial_limit, self.window)
+        return self._hosts[host]
+
+    async def acquire(self, url: str) -> str:
+        """Ждёт свободного слота для хоста из url и возвращает имя хоста для release/on_*"""
+        host = urlparse(url).hostname or ''
+        state = self._state(host)
+        loop = asyncio.get_running_loop()
+        async with state.condition:
+            while True:
+                blocked_for = state.blocked_until - loop.time()
+                if blocked_for > 0:
+                    try:
+                        await asyncio.wait_for(state.condition.wait(), timeout=blocked_for)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if state.in_flight < int(state.limit):
+                    break
+                await state.condition.wait()
+            state.in_flight += 1
+        return host
+
+    async def release(self, host: str):
+        state = self._state(host)
+        async with state.condition:
+            state.in_flight -= 1
+            state.condition.notify_all()
+
+    def on_success(self, host: str, latency: float):
+        state = self._state(host)
+        state.latencies.append(latency)
+        state.successes += 1
+        if state.successes < int(state.limit):
+            return
+        state.successes = 0
+        p90 = state.percentile(0.9)
+        if p90 <= self.latency_target:
+            self._set_limit(host, min(self.max_limit, state.limit + 1), f"p90 {p90:.2f}s в пределах цели {self.latency_target:.2f}s")
+        else:
+            self._decrease(host, f"p90 {p90:.2f}s выше цели {self.latency_target:.2f}s")
+
+    def on_timeout(self, host: str):
+        self._decrease(host, "таймаут запроса")
+
+    def on_throttled(self, host: str, status: int, retry_after: Optional[str] = None):
+        """Сервер ответил 429/503: уменьшаем лимит и соблюдаем Retry-After"""
+        delay = self.parse_retry_after(retry_after)
+        reason = f"HTTP {status}"
+        if delay:
+            state = self._state(host)
+            state.blocked_until = max(state.blocked_until, asyncio.get_running_loop().time() + delay)
+            reason += f", Retry-After {delay:.0f}s"
+        self._decrease(host, reason)
+
+    def _decrease(self, host: str, reason: str):
+        state = self._state(host)
+        now = time.monotonic()
+        # Одновременно упавшие запросы — это одна перегрузка, а не несколько
+        if now - state.last_decrease < self.latency_target:
+            return
+        state.last_decrease = now
+        state.successes = 0
+        self._set_limit(host, max(self.min_limit, state.limit * self.decrease_factor), reason)
+
+    def _set_limit(self, host: str, limit: float, reason: str):
+        state = self._state(host)
+        old_limit = int(state.limit)
+        state.limit = limit
+        if int(limit) == old_limit:
+            return
+        self.history.append({
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'host': host,
+            'old_limit': old_limit,
+            'new_limit': int(limit),
+            'reason': reason,
+        })
+        self.logger.info(f"Лимит параллельных запросов к {host}: {old_limit} → {int(limit)} ({reason})")
+
+    def latency(self, host: str, q: float) -> tuple[Optional[float], int]:
+        """Перцентиль q задержки ответов хоста и число замеров, по которым он посчитан"""
+        state = self._hosts.get(host)
+        if not state:
+            return None, 0
+        return state.percentile(q), len(state.latencies)
+
+    def reset_latency(self, host: str):
+        """Забывает замеры задержки хоста, например после смены зеркала: старые замеры о нём уже ничего не говорят"""
+        state = self._hosts.get(host)
+        if state:
+            state.latencies.clear()
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Текущие лимиты и задержки по хостам"""
+        return {
+            host: {
+                'limit': int(state.limit),
+                'in_flight': state.in_flight,
+                'p50': state.percentile(0.5),
+                'p90': state.percentile(0.9),
+            }
+            for host, state in self._hosts.items()
+        }
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Retry-After бывает числом секунд или HTTP-датой"""
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -1,22 +1,60 @@
+import hashlib
+import json
 import logging
 import os
+import re
 import mimetypes
 import aiohttp
 import aiofiles
 import asyncio
 from pathlib import Path
+from collections import OrderedDict
+from urllib.parse import urljoin, urlparse
 from tqdm.asyncio import tqdm
+from typing import Optional
+
+from application.parsing.requester.ContentStore import ContentStore
+from application.parsing.requester.RateLimiter import RateLimiter
+
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
 
 class ContentDownloader:
     def __init__(
         self,
         destination_path: Path = None,
         max_retries: int = 5,
-        retry_delay: float = 10.0
+        retry_delay: float = 2.0,
+        max_retry_delay: float = 60.0,
+        max_concurrent_downloads: int = 4,
+        max_downloads_per_host: int = 2,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_redirects: int = 10,
+        redirect_cache_size: int = 1024,
+        content_store: Optional[ContentStore] = None,
     ):
+        """
+        :param max_retries: сколько раз подряд можно повторить загрузку, не получив ни одного нового байта
+        :param retry_delay: начальная задержка перед повтором, удваивается при каждой неудаче без прогресса
+        :param max_retry_delay: верхняя граница задержки перед повтором
+        :param max_concurrent_downloads: общее ограничение одновременных загрузок
+        :param max_downloads_per_host: ограничение одновременных загрузок с одного хоста
+        :param rate_limiter: ограничитель частоты запросов (общий с Requester), None — без ограничения
+        :param max_redirects: максимальная длина цепочки редиректов
+        :param redirect_cache_size: сколько разрешённых адресов редиректов помнить
+        :param content_store: хранилище с дедупликацией по хешу содержимого, None — файлы сохраняются как есть
+        """
         self._destination_path = destination_path
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.max_downloads_per_host = max(1, int(max_downloads_per_host))
+        self._download_semaphore = asyncio.Semaphore(max(1, int(max_concurrent_downloads)))
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+        self._rate_limiter = rate_limiter
+        self.max_redirects = max_redirects
+        self.redirect_cache_size = redirect_cache_size
+        self._redirect_cache: dict[str, OrderedDict[str, str]] = {}
+        self._content_store = content_store
         self._session = None
         self.logger = logging.getLogger(self.__class__.__name__)
         
@@ -40,69 +78,52 @@ class ContentDownloader:
         self, 
         url: str, 
         filename: str,
+        headers: Optional[dict[str, str]] = None,
     ) -> str:
         """Скачивает файл с опциональной ручной обработкой редиректов"""
-        self.logger.info(f"Скачивается контент {filename} по адресу {url}")
-        return await self._download_with_redirects(url, filename)
-
-    async def _download_with_redirects(self, url: str, filename: str) -> str:
-        """Скачивание с ручной обработкой редиректов"""
-        async with self._session.get(url, allow_redirects=False) as first_response:
-            if first_response.status != 302:
-                self.logger.info(f"Статус код ответа {first_response.status}. Редиректа не было")
-                self.logger.info(f"Выполняется прямая загрузка")
-                return await self._download_direct(url, filename)
-            else:
-                redirect_url = first_response.headers.get('Location')
-                if not redirect_url:
-                    raise RuntimeError("Redirect location missing")
-                
-                self.logger.info(f"Редирект на: {redirect_url}")
+        # Сначала слот хоста, затем общий: иначе задачи в очереди к перегруженному хосту
+        # держали бы общие слоты и не пускали загрузки с других хостов
+        async with self._get_host_semaphore(url), self._download_semaphore:
+            self.logger.info(f"Скачивается контент {filename} по адресу {url}")
+            return await self._download_with_redirects(url, filename, headers)
 
-                return await self._download_direct(redirect_url, filename)
-    
-    async def _download_direct(self, url: str, filename: str) -> str:
-        """Прямое скачивание без обработки редиректов"""
+    def _get_host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).hostname or ''
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.max_downloads_per_host)
+        return self._host_semaphores[host]
+
+    async def _download_with_redirects(self, url: str, filename: str, headers: Optional[dict[str, str]] = None) -> str:
+        """
+        Скачивание с ручной обработкой редиректов.
+        Данные пишутся в {filename}.part; при повторе (в том числе после перезапуска программы)
+        загрузка продолжается Range-запросом с уже скачанного байта.
+        """
         self.logger.info(f"🚀 Начало загрузки: {filename} по url {url}")
         self.destination.mkdir(parents=True, exist_ok=True)
         base_path = self.destination / filename
+        part_path = self.destination / f"{filename}.part"
+        meta_path = self.destination / f"{filename}.part.json"
         
-        for attempt in range(self.max_retries + 1):
+        attempt = 0
+        failures = 0
+        while True:
+            attempt += 1
+            downloaded_before = self._part_size(part_path, meta_path, url)
             try:
-                async with self._session.get(url) as response:
-                    response.raise_for_status()
-                
-                    extension = self._get_file_extension(response)
-                    file_path = base_path.with_suffix(extension)
-                    total_size = int(response.headers.get('Content-Length', 0))
-                    
-                    progress_bar = tqdm(
-                        total=total_size,
-                        unit='B',
-                        unit_scale=True,
-                        unit_divisor=1024,
-                        desc=f"{filename[:20]:<20}",
-                        bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]"
-                    )
-                    
-                    async with aiofiles.open(file_path, 'wb') as f:
-                        async for chunk in response.content.iter_chunked(8192):
-                            await f.write(chunk)
-                            progress_bar.update(len(chunk))
-                    
-                    progress_bar.close()
-                    
-                    if total_size > 0 and file_path.stat().st_size != total_size:
-                        raise RuntimeError(f"Неполная загрузка: {file_path.stat().st_size}/{total_size} байт")
-                    
-                    self.logger.info(f"✅ Успешно загружено: {filename}")
-                    return str(file_path)
+                file_path = await self._download_part(url, filename, base_path, part_path, meta_path, headers)
+                self.logger.info(f"✅ Успешно загружено: {filename}")
+                return str(file_path)
             
             except Exception as e:
-                if attempt < self.max_retries:
-                    wait_time = self.retry_delay * (2 ** attempt)
+                if self._part_size(part_path, meta_path, url) > downloaded_before:
+                    failures = 0
+                else:
+                    failures += 1
+                if failures <= self.max_retries:
+                    wait_time = min(self.retry_delay * (2 ** max(failures - 1, 0)), self.max_retry_delay)
                     self.logger.warning(
-                        f"⚠️ Ошибка загрузки (попытка {attempt+1}/{self.max_retries}): "
+                        f"⚠️ Ошибка загрузки (попытка {attempt}, подряд без прогресса {failures}/{self.max_retries}): "
                         f"{type(e).__name__} - {str(e)}"
                     )
                     self.logger.info(f"⏳ Повторная попытка через {wait_time:.1f} сек...")
@@ -112,6 +133,217 @@ class ContentDownloader:
                     self.logger.error(f"❌ Ошибка: {type(e).__name__} - {str(e)}", exc_info=False)
                     raise
 
+    async def _download_part(
+        self,
+        url: str,
+        filename: str,
+        base_path: Path,
+        part_path: Path,
+        meta_path: Path,
+        headers: Optional[dict[str, str]] = None,
+    ) -> Path:
+        """Одна попытка загрузки: докачивает .part файл и переименовывает его после проверки размера"""
+        meta = self._read_part_meta(meta_path, url)
+        offset = self._part_size(part_path, meta_path, url)
+        request_headers = dict(headers or {})
+        if offset > 0:
+            request_headers['Range'] = f"bytes={offset}-"
+            if meta.get('etag'):
+                request_headers['If-Range'] = meta['etag']
+        
+        response = await self._get_following_redirects(url, request_headers)
+        async with response:
+            if response.status in (403, 404, 410) and self._forget_redirect(url):
+                raise RuntimeError(f"Сохранённый адрес редиректа устарел (статус {response.status}), повтор с исходной ссылки")
+            if response.status == 416 and offset > 0:
+                if offset == meta.get('total_size'):
+                    self.logger.info(f"Файл {filename} уже полностью загружен ранее")
+                    return await self._finalize_part(base_path, part_path, meta_path, meta)
+                self._discard_part(part_path, meta_path)
+                raise RuntimeError("Сервер отклонил диапазон, загрузка начнётся заново")
+            response.raise_for_status()
+            
+            etag = response.headers.get('ETag')
+            if response.status == 206:
+                range_start, total_size = self._parse_content_range(response.headers.get('Content-Range', ''))
+                if range_start != offset:
+                    raise RuntimeError(f"Сервер вернул диапазон с байта {range_start} вместо {offset}")
+                if meta.get('total_size') and total_size and total_size != meta['total_size']:
+                    self._discard_part(part_path, meta_path)
+                    raise RuntimeError("Размер файла на сервере изменился, загрузка начнётся заново")
+                if meta.get('etag') and etag and etag != meta['etag']:
+                    self._discard_part(part_path, meta_path)
+                    raise RuntimeError("ETag файла на сервере изменился, загрузка начнётся заново")
+                mode = 'ab'
+                self.logger.info(f"Продолжение загрузки {filename} с {offset} байт")
+            else:
+                offset = 0
+                total_size = int(response.headers.get('Content-Length', 0)) or None
+                mode = 'wb'
+                known_path = self._find_in_store(response)
+                if known_path:
+                    self.logger.info(f"Файл {filename} с тем же содержимым уже скачан, загрузка пропущена")
+                    self._discard_part(part_path, meta_path)
+                    return self._content_store.link(known_path, base_path.with_suffix(known_path.suffix))
+            
+            meta = {
+                'url': url,
+                'source_url': str(response.url),
+                'etag': etag or meta.get('etag'),
+                'total_size': total_size or meta.get('total_size'),
+                'extension': self._get_file_extension(response),
+            }
+            self._write_part_meta(meta_path, meta)
+            
+            hasher = hashlib.sha256()
+            if mode == 'ab' and self._content_store:
+                await self._hash_file(part_path, hasher)
+            
+            progress_bar = tqdm(
+                total=meta['total_size'] or 0,
+                initial=offset,
+                unit='B',
+                unit_scale=True,
+                unit_divisor=1024,
+                desc=f"{filename[:20]:<20}",
+                bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]"
+            )
+            try:
+                async with aiofiles.open(part_path, mode) as f:
+                    async for chunk in response.content.iter_chunked(8192):
+                        await f.write(chunk)
+                        hasher.update(chunk)
+                        progress_bar.update(len(chunk))
+            finally:
+                progress_bar.close()
+        
+        size = part_path.stat().st_size
+        if meta['total_size'] and size != meta['total_size']:
+            raise RuntimeError(f"Неполная загрузка: {size}/{meta['total_size']} байт")
+        return await self._finalize_part(base_path, part_path, meta_path, meta, hasher.hexdigest())
+
+    async def _get_following_redirects(self, url: str, headers: dict[str, str]) -> aiohttp.ClientResponse:
+        """
+        Отправляет GET без автоматических редиректов и сам проходит по цепочке Location.
+        Ответ, не являющийся редиректом, возвращается для чтения тела — повторный запрос не нужен.
+        Если конечный адрес для url уже известен, запрос сразу уходит на него.
+        """
+        target = self._get_redirect(url) or url
+        for _ in range(self.max_redirects + 1):
+            await self._wait_rate_limit(target)
+            response = await self._session.get(target, headers=headers, allow_redirects=False)
+            if response.status not in REDIRECT_STATUSES:
+                if target != url:
+                    self._remember_redirect(url, target)
+                return response
+            
+            location = response.headers.get('Location')
+            response.release()
+            if not location:
+                raise RuntimeError("Redirect location missing")
+            target = urljoin(str(response.url), location)
+            self.logger.info(f"Редирект на: {target}")
+        raise RuntimeError(f"Превышено число редиректов ({self.max_redirects}) для {url}")
+
+    def _get_redirect(self, url: str) -> Optional[str]:
+        host_cache = self._redirect_cache.get(urlparse(url).hostname or '')
+        if not host_cache or url not in host_cache:
+            return None
+        host_cache.move_to_end(url)
+        return host_cache[url]
+
+    def _remember_redirect(self, url: str, target: str):
+        """Запоминает конечный адрес редиректа; кэш свой для каждого хоста загрузок"""
+        host_cache = self._redirect_cache.setdefault(urlparse(url).hostname or '', OrderedDict())
+        host_cache[url] = target
+        host_cache.move_to_end(url)
+        while len(host_cache) > self.redirect_cache_size:
+            host_cache.popitem(last=False)
+
+    def _forget_redirect(self, url: str) -> bool:
+        host_cache = self._redirect_cache.get(urlparse(url).hostname or '')
+        return bool(host_cache) and host_cache.pop(url, None) is not None
+
+    async def _finalize_part(
+        self,
+        base_path: Path,
+        part_path: Path,
+        meta_path: Path,
+        meta: dict,
+        digest: Optional[str] = None,
+    ) -> Path:
+        """Переносит завершённый .part файл на место (или в хранилище с жёсткой ссылкой)"""
+        file_path = base_path.with_suffix(meta['extension'])
+        if self._content_store:
+            if not digest:
+                digest = (await self._hash_file(part_path, hashlib.sha256())).hexdigest()
+            stored_path = self._content_store.add(
+                part_path,
+                digest,
+                meta['extension'],
+                url=meta.get('source_url', meta['url']),
+                etag=meta.get('etag'),
+            )
+            file_path = self._content_store.link(stored_path, file_path)
+        else:
+            os.replace(part_path, file_path)
+        self._discard_part(None, meta_path)
+        return file_path
+
+    def _find_in_store(self, response: aiohttp.ClientResponse) -> Optional[Path]:
+        """Проверяет, не объявил ли сервер хеш или ETag уже сохранённого файла"""
+        if not self._content_store:
+            return None
+        announced_digest = ContentStore.parse_digest_header(
+            response.headers.get('Repr-Digest') or response.headers.get('Digest')
+        )
+        return self._content_store.find(
+            str(response.url),
+            etag=response.headers.get('ETag'),
+            digest=announced_digest,
+        )
+
+    async def _hash_file(self, path: Path, hasher):
+        async with aiofiles.open(path, 'rb') as f:
+            while chunk := await f.read(1024 * 1024):
+                hasher.update(chunk)
+        return hasher
+
+    def _part_size(self, part_path: Path, meta_path: Path, url: str) -> int:
+        """Размер уже скачанной части; часть без метаданных или от другого url не используется"""
+        if not part_path.exists() or not self._read_part_meta(meta_path, url):
+            return 0
+        return part_path.stat().st_size
+
+    def _read_part_meta(self, meta_path: Path, url: str) -> dict:
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return meta if meta.get('url') == url else {}
+
+    def _write_part_meta(self, meta_path: Path, meta: dict):
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+    def _discard_part(self, part_path: Optional[Path], meta_path: Path):
+        for path in (part_path, meta_path):
+            if path and path.exists():
+                os.remove(path)
+
+    def _parse_content_range(self, content_range: str) -> tuple[Optional[int], Optional[int]]:
+        """Разбирает заголовок вида 'bytes 100-199/1000' в (начало, полный размер)"""
+        match = re.match(r'bytes\s+(\d+)-\d+/(\d+|\*)', content_range)
+        if not match:
+            return None, None
+        total = match.group(2)
+        return int(match.group(1)), int(total) if total != '*' else None
+
+    async def _wait_rate_limit(self, url: str):
+        if self._rate_limiter:
+            await self._rate_limiter.wait(url)
+
     def _get_file_extension(self, response: aiohttp.ClientResponse) -> str:
         """Определяет расширение файла на основе заголовков ответа"""
         content_type = response.headers.get('Content-Type', '').split(';')[0].strip()
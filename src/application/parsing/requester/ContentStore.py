@@ -0,0 +1,125 @@
+import base64
+import binascii
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Optional
+
+class ContentStore:
+    def __init__(self, directory: Path):
+        """
+        Хранилище скачанных файлов, адресуемое по SHA-256 содержимого.
+        Одинаковые архивы хранятся один раз в objects/, а в каталог источника
+        на них ставятся жёсткие ссылки.
+
+        :param directory: каталог хранилища (objects/ и index.json)
+        """
+        self._directory = Path(directory)
+        self._index_path = self._directory / "index.json"
+        self._index: Optional[dict[str, dict[str, str]]] = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _load_index(self) -> dict[str, dict[str, str]]:
+        if self._index is not None:
+            return self._index
+        try:
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                self._index = json.load(f)
+        except (OSError, ValueError):
+            self._index = {}
+        for section in ("objects", "etags"):
+            self._index.setdefault(section, {})
+        return self._index
+
+    def _save_index(self):
+        self._directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._index_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path)
+
+    def _object_path(self, digest: str) -> Optional[Path]:
+        relative = self._load_index()["objects"].get(digest)
+        if not relative:
+            return None
+        path = self._directory / relative
+        return path if path.exists() else None
+
+    def _etag_key(self, url: str, etag: str) -> str:
+        # Строгий ETag уникален только в пределах одного ресурса: у nginx это mtime-размер,
+        # и у двух разных архивов одного хоста он может совпасть
+        return f"{url} {etag}"
+
+    def find(self, url: str, etag: Optional[str] = None, digest: Optional[str] = None) -> Optional[Path]:
+        """
+        Ищет уже сохранённый файл по объявленному сервером хешу (заголовки Digest/Repr-Digest)
+        или по ETag, с которым этот файл был скачан раньше по той же ссылке.
+        """
+        index = self._load_index()
+        if digest and (path := self._object_path(digest)):
+            return path
+        if etag and (etag_digest := index["etags"].get(self._etag_key(url, etag))):
+            return self._object_path(etag_digest)
+        return None
+
+    def add(
+        self,
+        file_path: Path,
+        digest: str,
+        extension: str,
+        url: Optional[str] = None,
+        etag: Optional[str] = None,
+    ) -> Path:
+        """
+        Переносит скачанный файл в хранилище. Если файл с таким хешем уже есть,
+        новая копия удаляется. Возвращает путь к объекту в хранилище.
+        """
+        index = self._load_index()
+        stored_path = self._object_path(digest)
+        if stored_path:
+            self.logger.info(f"Файл {digest[:12]} уже есть в хранилище, дубликат удалён")
+            os.remove(file_path)
+        else:
+            relative = Path("objects") / digest[:2] / f"{digest}{extension}"
+            stored_path = self._directory / relative
+            stored_path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(file_path, stored_path)
+            index["objects"][digest] = relative.as_posix()
+        if url and etag and not etag.startswith("W/"):
+            index["etags"][self._etag_key(url, etag)] = digest
+        self._save_index()
+        return stored_path
+
+    def link(self, stored_path: Path, target_path: Path) -> Path:
+        """
+        Ставит жёсткую ссылку target_path на объект хранилища.
+        Если файловая система не поддерживает ссылки — возвращает путь к самому объекту.
+        """
+        if target_path.exists():
+            if os.path.samefile(target_path, stored_path):
+                return target_path
+            os.remove(target_path)
+        try:
+            os.link(stored_path, target_path)
+            return target_path
+        except OSError:
+            self.logger.warning(f"Не удалось создать жёсткую ссылку {target_path}, используется путь в хранилище")
+            return stored_path
+
+    @staticmethod
+    def parse_digest_header(value: Optional[str]) -> Optional[str]:
+        """
+        Достаёт SHA-256 (hex) из заголовков вида
+        'Digest: SHA-256=<base64>' или 'Repr-Digest: sha-256=:<base64>:'.
+        """
+        if not value:
+            return None
+        match = re.search(r'sha-256=:?([A-Za-z0-9+/=]+):?', value, flags=re.IGNORECASE)
+        if not match:
+            return None
+        try:
+            return base64.b64decode(match.group(1)).hex()
+        except (binascii.Error, ValueError):
+            return None
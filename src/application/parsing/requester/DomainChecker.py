@@ -1,22 +1,38 @@
 import asyncio
+import json
 import logging
-from typing import List, Optional, Dict, Any
+import os
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Dict, Any
 
 from application.parsing.requester.Requester import Requester
 
 class DomainChecker:
-    def __init__(self, requester: Requester, timeout: float = 15.0, concurrency: int = 0):
+    def __init__(
+        self,
+        requester: Requester,
+        timeout: float = 15.0,
+        concurrency: int = 0,
+        state_path: Optional[Path] = None,
+        state_ttl: float = 6 * 60 * 60,
+    ):
         """
         :param requester: экземпляр Requester (контекстный менеджер). Если его сессия ещё не открыта,
                           DomainChecker откроет её локально на время проверки.
         :param timeout: максимум секунд, которые DomainChecker будет ждать ответа для каждого домена (per-task timeout)
         :param concurrency: максимум параллельных задач (0 или <=0 — без ограничения)
+        :param state_path: файл, в котором сохраняются результаты проверок между запусками (None — не сохранять)
+        :param state_ttl: сколько секунд сохранённым результатам можно доверять при старте
         """
         self.requester = requester
         self.logger = logging.getLogger(self.__class__.__name__)
         self.timeout = float(timeout)
         self._concurrency = int(concurrency) if concurrency is not None else 0
-
+        self.ranking: Dict[str, Optional[float]] = {}
+        self._monitor_task: Optional[asyncio.Task] = None
+        self.state_path = Path(state_path) if state_path else None
+        self.state_ttl = state_ttl
 
     async def _check_domain(self, domain: str) -> Optional[float]:
         """
@@ -28,7 +44,7 @@ class DomainChecker:
         start = loop.time()
         try:
             self.logger.debug("Проверка домена: %s", domain)
-            await asyncio.wait_for(self.requester.head(url), timeout=self.timeout)
+            await asyncio.wait_for(self.requester.probe(url), timeout=self.timeout)
             elapsed = loop.time() - start
             self.logger.info("Домен %s доступен, время отклика: %.3fs", domain, elapsed)
             return elapsed
@@ -46,8 +62,44 @@ class DomainChecker:
         """
         if not domains:
             return None
+        domain = self._restore_ranking(domains)
+        if domain:
+            self.logger.info("Выбран домен по результатам прошлой проверки: %s", domain)
+            return domain
         return await self._run_checks(domains)
 
+    def _restore_ranking(self, domains: List[str]) -> Optional[str]:
+        """
+        Загружает сохранённый рейтинг, если он не старше state_ttl, и возвращает самый быстрый домен из него.
+        Актуальность рейтинга затем подтверждает фоновая проверка.
+        """
+        if not self.state_path:
+            return None
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            age = time.time() - state['checked_at']
+            ranking = state['ranking']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if age > self.state_ttl:
+            return None
+        self.ranking = {domain: ranking.get(domain) for domain in domains}
+        ranked = self.ranked()
+        return ranked[0] if ranked else None
+
+    def _save_ranking(self):
+        if not self.state_path:
+            return
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.state_path.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"checked_at": time.time(), "ranking": self.ranking}, f)
+            os.replace(tmp_path, self.state_path)
+        except OSError as exc:
+            self.logger.warning("Не удалось сохранить результаты проверки доменов: %s", exc)
+
     async def _run_checks(self, domains: List[str]) -> Optional[str]:
         sem = asyncio.Semaphore(self._concurrency) if self._concurrency and self._concurrency > 0 else None
 
@@ -92,6 +144,8 @@ class DomainChecker:
 
                 if elapsed is not None:
                     self.logger.info("Выбран домен: %s (время %.3fs)", domain, elapsed)
+                    self.ranking[domain] = elapsed
+                    self._save_ranking()
                     for t in tasks:
                         if t is not fut and not t.done():
                             t.cancel()
@@ -108,3 +162,64 @@ class DomainChecker:
                 if not t.done():
                     t.cancel()
             await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def rank_domains(self, domains: List[str]) -> List[str]:
+        """
+        Проверяет все домены (не останавливаясь на первом ответившем), обновляет self.ranking
+        и возвращает доступные домены от самого быстрого к самому медленному.
+        """
+        sem = asyncio.Semaphore(self._concurrency) if self._concurrency and self._concurrency > 0 else None
+
+        async def check(domain: str) -> Optional[float]:
+            if sem:
+                async with sem:
+                    return await self._check_domain(domain)
+            return await self._check_domain(domain)
+
+        results = await asyncio.gather(*(check(d) for d in domains))
+        self.ranking = dict(zip(domains, results))
+        self._save_ranking()
+        return self.ranked()
+
+    def ranked(self, exclude: Optional[str] = None) -> List[str]:
+        """Доступные по последней проверке домены, отсортированные по времени отклика"""
+        return sorted(
+            (domain for domain, elapsed in self.ranking.items() if elapsed is not None and domain != exclude),
+            key=lambda domain: self.ranking[domain],
+        )
+
+    def start_monitoring(
+        self,
+        domains: List[str],
+        interval: float,
+        on_update: Optional[Callable[[List[str]], None]] = None,
+    ):
+        """
+        Запускает фоновую проверку всех доменов раз в interval секунд.
+        После каждого круга on_update получает актуальный рейтинг доступных доменов.
+        """
+        if self._monitor_task and not self._monitor_task.done():
+            return
+        self._monitor_task = asyncio.create_task(self._monitor(domains, interval, on_update))
+
+    def stop_monitoring(self):
+        if self._monitor_task:
+            self._monitor_task.cancel()
+            self._monitor_task = None
+
+    async def _monitor(
+        self,
+        domains: List[str],
+        interval: float,
+        on_update: Optional[Callable[[List[str]], None]],
+    ):
+        while True:
+            try:
+                ranked = await self.rank_domains(domains)
+            except Exception as exc:
+                self.logger.warning("Ошибка фоновой проверки доменов: %s", exc)
+            else:
+                self.logger.debug("Рейтинг доменов: %r", self.ranking)
+                if on_update:
+                    on_update(ranked)
+            await asyncio.sleep(interval)
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import aiofiles
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+class HttpCache:
+    def __init__(
+        self,
+        directory: Path,
+        ttl_rules: Optional[list[tuple[str, float]]] = None,
+        default_ttl: float = 0.0,
+        max_size: int = 256 * 1024 * 1024,
+    ):
+        """
+        Дисковый HTTP кэш страниц с поддержкой условных GET-запросов.
+
+        :param directory: каталог, в котором хранятся тела ответов и их метаданные
+        :param ttl_rules: список (регулярное выражение для url, время свежести в секундах);
+                          применяется первое совпавшее правило
+        :param default_ttl: время свежести для url, не попавших ни под одно правило
+        :param max_size: максимальный суммарный размер тел ответов в байтах
+        """
+        self._directory = Path(directory)
+        self._ttl_rules = [(re.compile(pattern), ttl) for pattern, ttl in (ttl_rules or [])]
+        self.default_ttl = default_ttl
+        self.max_size = max_size
+        self._index: Optional[OrderedDict[str, dict[str, Any]]] = None
+        self._size = 0
+        self.stats = {"hits": 0, "misses": 0, "revalidations": 0, "evictions": 0}
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _meta_path(self, key: str) -> Path:
+        return self._directory / f"{key}.json"
+
+    def _body_path(self, key: str) -> Path:
+        return self._directory / f"{key}.html"
+
+    def _load_index(self) -> OrderedDict[str, dict[str, Any]]:
+        """Читает метаданные всех записей с диска (один раз за запуск), от старых к новым"""
+        if self._index is not None:
+            return self._index
+        self._directory.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for meta_path in self._directory.glob("*.json"):
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    entries.append(json.load(f))
+            except (OSError, ValueError):
+                self.logger.warning(f"Повреждённая запись HTTP кэша {meta_path.name}, пропуск")
+        entries.sort(key=lambda entry: entry['stored_at'])
+        self._index = OrderedDict((entry['key'], entry) for entry in entries)
+        self._size = sum(entry['size'] for entry in entries)
+        return self._index
+
+    def _ttl(self, url: str) -> float:
+        for pattern, ttl in self._ttl_rules:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    def get_entry(self, url: str) -> Optional[dict[str, Any]]:
+        return self._load_index().get(self._key(url))
+
+    def is_fresh(self, entry: dict[str, Any]) -> bool:
+        return time.time() - entry['stored_at'] < self._ttl(entry['url'])
+
+    def conditional_headers(self, entry: dict[str, Any]) -> dict[str, str]:
+        """Заголовки для повторной валидации записи на сервере"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    async def read(self, entry: dict[str, Any]) -> Optional[str]:
+        """Отдаёт свежую запись без обращения к сети"""
+        body = await self._read_body(entry)
+        if body is not None:
+            self.stats["hits"] += 1
+        return body
+
+    async def revalidated(self, entry: dict[str, Any]) -> Optional[str]:
+        """Сервер ответил 304: продлеваем свежесть записи и отдаём сохранённое тело"""
+        body = await self._read_body(entry)
+        if body is None:
+            return None
+        self.stats["revalidations"] += 1
+        entry['stored_at'] = time.time()
+        await self._write_meta(entry)
+        return body
+
+    async def store(
+        self,
+        url: str,
+        body: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        self.stats["misses"] += 1
+        index = self._load_index()
+        key = self._key(url)
+        data = body.encode('utf-8')
+        async with aiofiles.open(self._body_path(key), 'wb') as f:
+            await f.write(data)
+        if key in index:
+            self._size -= index.pop(key)['size']
+        entry = {
+            'key': key,
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'stored_at': time.time(),
+            'size': len(data),
+        }
+        index[key] = entry
+        self._size += entry['size']
+        await self._write_meta(entry)
+        self._evict()
+
+    async def _read_body(self, entry: dict[str, Any]) -> Optional[str]:
+        self._load_index().move_to_end(entry['key'])
+        try:
+            async with aiofiles.open(self._body_path(entry['key']), 'rb') as f:
+                return (await f.read()).decode('utf-8')
+        except OSError:
+            self._remove(entry['key'])
+            return None
+
+    async def _write_meta(self, entry: dict[str, Any]):
+        async with aiofiles.open(self._meta_path(entry['key']), 'w', encoding='utf-8') as f:
+            await f.write(json.dumps(entry))
+
+    def _evict(self):
+        """Удаляет давно не использованные записи, пока кэш больше max_size"""
+        index = self._load_index()
+        while self._size > self.max_size and len(index) > 1:
+            key = next(iter(index))
+            self._remove(key)
+            self.stats["evictions"] += 1
+
+    def _remove(self, key: str):
+        entry = self._load_index().pop(key, None)
+        if entry:
+            self._size -= entry['size']
+        for path in (self._meta_path(key), self._body_path(key)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import aiohttp
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+class ProxyState:
+    def __init__(self, url: str):
+        self.url = url
+        self.success_rate = 1.0
+        self.latency: Optional[float] = None
+        self.consecutive_failures = 0
+        self.quarantined = False
+        self.quarantine_count = 0
+        self.probe_at = 0.0
+
+    def score(self, default_latency: float) -> float:
+        """Чем меньше, тем лучше: ожидаемое время ответа с поправкой на долю неудач"""
+        latency = self.latency if self.latency is not None else default_latency
+        return latency / max(self.success_rate, 0.05)
+
+class ProxyPool:
+    def __init__(
+        self,
+        proxies: list[str],
+        alpha: float = 0.3,
+        failure_threshold: int = 3,
+        quarantine_delay: float = 30.0,
+        max_quarantine_delay: float = 600.0,
+        min_sticky_success_rate: float = 0.7,
+        probe_url: Optional[str] = None,
+        probe_interval: float = 5.0,
+        probe_timeout: float = 15.0,
+    ):
+        """
+        Пул прокси с оценкой здоровья каждого прокси.
+
+        :param proxies: адреса прокси
+        :param alpha: вес нового наблюдения в EWMA доли успехов и задержки
+        :param failure_threshold: после скольких неудач подряд прокси уходит в карантин
+        :param quarantine_delay: начальная длительность карантина, удваивается при каждом повторном карантине
+        :param max_quarantine_delay: верхняя граница длительности карантина
+        :param min_sticky_success_rate: ниже этой доли успехов хост отвязывается от «тёплого» прокси
+        :param probe_url: адрес для фоновой проверки прокси из карантина; по умолчанию — последний запрошенный сайт
+        :param probe_interval: как часто фоновая задача ищет прокси, готовые к проверке
+        :param probe_timeout: таймаут проверочного запроса
+        """
+        self._states = [ProxyState(proxy) for proxy in proxies]
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.quarantine_delay = quarantine_delay
+        self.max_quarantine_delay = max_quarantine_delay
+        self.min_sticky_success_rate = min_sticky_success_rate
+        self.probe_url = probe_url
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self._sticky: dict[str, ProxyState] = {}
+        self._by_url = {state.url: state for state in self._states}
+        self._last_origin: Optional[str] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._probe_task: Optional[asyncio.Task] = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def __len__(self):
+        return len(self._states)
+
+    def _now(self) -> float:
+        return asyncio.get_running_loop().time()
+
+    def _default_latency(self) -> float:
+        latencies = [state.latency for state in self._states if state.latency is not None]
+        return sum(latencies) / len(latencies) if latencies else 1.0
+
+    def choose(self, url: str) -> Optional[str]:
+        """
+        Выбирает прокси для запроса. Хост закрепляется за «тёплым» прокси, пока тот здоров,
+        чтобы переиспользовать соединения; иначе берётся прокси с лучшей оценкой.
+        """
+        if not self._states:
+            return None
+        parsed = urlparse(url)
+        host = parsed.hostname or ''
+        self._last_origin = f"{parsed.scheme}://{parsed.netloc}"
+
+        sticky = self._sticky.get(host)
+        if sticky and not sticky.quarantined and sticky.success_rate >= self.min_sticky_success_rate:
+            return sticky.url
+
+        healthy = [state for state in self._states if not state.quarantined]
+        if not healthy:
+            state = min(self._states, key=lambda state: state.probe_at)
+            self.logger.warning(f"Все прокси в карантине, используется {state.url}")
+            return state.url
+        default_latency = self._default_latency()
+        best = min(healthy, key=lambda state: state.score(default_latency))
+        self._sticky[host] = best
+        return best.url
+
+    def report_success(self, proxy: Optional[str], latency: float):
+        state = self._by_url.get(proxy)
+        if not state:
+            return
+        state.success_rate += self.alpha * (1.0 - state.success_rate)
+        state.latency = latency if state.latency is None else state.latency + self.alpha * (latency - state.latency)
+        state.consecutive_failures = 0
+
+    def report_failure(self, proxy: Optional[str]):
+        state = self._by_url.get(proxy)
+        if not state:
+            return
+        state.success_rate -= self.alpha * state.success_rate
+        state.consecutive_failures += 1
+        if not state.quarantined and state.consecutive_failures >= self.failure_threshold:
+            self._quarantine(state)
+
+    def _quarantine(self, state: ProxyState):
+        delay = min(self.quarantine_delay * (2 ** state.quarantine_count), self.max_quarantine_delay)
+        state.quarantined = True
+        state.quarantine_count += 1
+        state.probe_at = self._now() + delay
+        for host, sticky in list(self._sticky.items()):
+            if sticky is state:
+                del self._sticky[host]
+        self.logger.warning(f"Прокси {state.url} отправлен в карантин на {delay:.0f} сек")
+
+    def attach(self, session: Optional[aiohttp.ClientSession]):
+        """Привязывает пул к сессии и запускает фоновую проверку прокси из карантина; None — останавливает её"""
+        self._session = session
+        if session is None:
+            if self._probe_task:
+                self._probe_task.cancel()
+                self._probe_task = None
+        elif self._probe_task is None:
+            self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def _probe_loop(self):
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            now = self._now()
+            due = [state for state in self._states if state.quarantined and state.probe_at <= now]
+            if due:
+                await asyncio.gather(*(self._probe(state) for state in due))
+
+    async def _probe(self, state: ProxyState):
+        probe_url = self.probe_url or self._last_origin
+        if not probe_url or not self._session:
+            return
+        started_at = self._now()
+        try:
+            async with self._session.head(
+                probe_url,
+                proxy=state.url,
+                timeout=aiohttp.ClientTimeout(total=self.probe_timeout),
+            ) as response:
+                response.raise_for_status()
+        except Exception as ex:
+            self.logger.info(f"Прокси {state.url} не прошёл проверку: {type(ex).__name__}")
+            self._quarantine(state)
+            return
+        state.quarantined = False
+        state.consecutive_failures = 0
+        state.success_rate = 0.5
+        state.latency = self._now() - started_at
+        self.logger.info(f"Прокси {state.url} прошёл проверку и возвращён в пул")
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        return [
+            {
+                'proxy': state.url,
+                'success_rate': round(state.success_rate, 3),
+                'latency': state.latency,
+                'quarantined': state.quarantined,
+            }
+            for state in self._states
+        ]
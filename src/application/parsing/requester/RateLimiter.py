@@ -0,0 +1,70 @@
+import asyncio
+import random
+from typing import Optional
+from urllib.parse import urlparse
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        :param rate: скорость пополнения корзины (запросов в секунду)
+        :param burst: ёмкость корзины — сколько запросов можно выполнить подряд без ожидания
+        """
+        self.rate = float(rate)
+        self.capacity = max(1, int(burst))
+        self._tokens = float(self.capacity)
+        self._updated_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        if self._updated_at is not None:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self):
+        """Забирает один токен, при необходимости дожидаясь его появления"""
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            self._refill(loop.time())
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill(loop.time())
+            self._tokens -= 1
+
+class RateLimiter:
+    def __init__(
+        self,
+        rate: float = 0.5,
+        burst: int = 2,
+        jitter: float = 0.0,
+        host_limits: Optional[dict[str, dict[str, float]]] = None
+    ):
+        """
+        Ограничитель частоты запросов с отдельной token bucket для каждого хоста.
+
+        :param rate: запросов в секунду к одному хосту
+        :param burst: сколько запросов к хосту можно выполнить подряд без ожидания
+        :param jitter: максимальная случайная добавка к ожиданию (секунды)
+        :param host_limits: переопределения параметров для отдельных хостов,
+                            например {"cdn.example.com": {"rate": 2, "burst": 4}}
+        """
+        self.rate = rate
+        self.burst = burst
+        self.jitter = jitter
+        self._host_limits = host_limits or {}
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def _get_bucket(self, host: str) -> TokenBucket:
+        if host not in self._buckets:
+            limits = self._host_limits.get(host, {})
+            self._buckets[host] = TokenBucket(
+                rate=limits.get('rate', self.rate),
+                burst=limits.get('burst', self.burst),
+            )
+        return self._buckets[host]
+
+    async def wait(self, url: str):
+        """Дожидается разрешения на запрос к хосту из url"""
+        host = urlparse(url).hostname or ''
+        await self._get_bucket(host).acquire()
+        if self.jitter > 0:
+            await asyncio.sleep(random.uniform(0, self.jitter))
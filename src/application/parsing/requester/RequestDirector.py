@@ -1,8 +1,13 @@
 import aiohttp
-from typing import Dict
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
 from fake_useragent import UserAgent
 
-from application.parsing.exceptions import NoOneAvailableDomen
+from application.parsing.exceptions import NoOneAvailableDomen, PageNotFound
 from application.parsing.requester.ContentDownloader import ContentDownloader
 from application.parsing.requester.DomainChecker import DomainChecker
 from application.parsing.requester.Requester import Requester
@@ -22,6 +27,11 @@ DEFAULT_HEADERS = {
 }
 
 class RequestDirector:
+    # Не чаще раза в столько секунд предупреждать, что зеркало деградировало, а заменить его нечем
+    NO_REPLACEMENT_WARNING_INTERVAL = 300.0
+    # Сколько раз повторять запрос после переключения на другое зеркало
+    FAILOVER_RETRIES = 1
+    
     def __init__(
         self,
         requester: Requester,
@@ -29,8 +39,28 @@ class RequestDirector:
         downloader: ContentDownloader,
         domains: list[Address],
         headers: dict[str, str],
-        timeout
+        timeout,
+        connection_limit: int = 100,
+        connection_limit_per_host: int = 10,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 30.0,
+        probe_interval: float = 300.0,
+        error_rate_threshold: float = 0.3,
+        latency_threshold: float = 10.0,
+        health_window: int = 20,
+        min_samples: int = 5,
     ):
+        """
+        :param connection_limit: общий размер пула соединений
+        :param connection_limit_per_host: максимум соединений к одному хосту
+        :param dns_cache_ttl: время жизни DNS кэша (секунды)
+        :param keepalive_timeout: сколько держать простаивающее keep-alive соединение (секунды)
+        :param probe_interval: как часто в фоне проверять все зеркала (секунды)
+        :param error_rate_threshold: доля неудачных запросов к зеркалу, после которой оно меняется на другое
+        :param latency_threshold: p90 времени ответа зеркала (секунды), после которого оно меняется на другое
+        :param health_window: по скольким последним запросам считать долю ошибок
+        :param min_samples: минимум замеров, прежде чем судить о здоровье зеркала
+        """
         self._domains = [domain.address for domain in domains]
         self._requester = requester
         self._domain_checker = domain_checker
@@ -39,13 +69,92 @@ class RequestDirector:
         self._user_agent = UserAgent()
         self._headers = headers or DEFAULT_HEADERS
         self.timeout = timeout
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.probe_interval = probe_interval
+        self.error_rate_threshold = error_rate_threshold
+        self.latency_threshold = latency_threshold
+        self.min_samples = min_samples
+        self.base: Optional[str] = None
+        self._outcomes: deque[bool] = deque(maxlen=health_window)
+        self._base_listeners: list[Callable[[str], None]] = []
+        self.mirror_switches: list[dict[str, Any]] = []
+        self._no_replacement_warned_at: Optional[float] = None
+        self.logger = logging.getLogger(self.__class__.__name__)
 
     async def initialize(self):
         await self.open()
         domain = await self.get_available_domain(self._domains)        
         if not domain:
             raise NoOneAvailableDomen()              
-        self.base = domain                
+        self._set_base(domain)
+        self._domain_checker.start_monitoring(self._domains, self.probe_interval, self._on_ranking_update)
+    
+    def add_base_listener(self, listener: Callable[[str], None]):
+        """listener вызывается с новым доменом каждый раз, когда меняется рабочее зеркало"""
+        self._base_listeners.append(listener)
+    
+    def _set_base(self, domain: str):
+        if domain == self.base:
+            return
+        old_base, self.base = self.base, domain
+        self._outcomes.clear()
+        # Замеры задержки старого зеркала не должны сразу же увести с него при возврате, а нового — с него
+        for host in (old_base, domain):
+            if host:
+                self._requester.concurrency.reset_latency(host)
+        for listener in self._base_listeners:
+            listener(domain)
+    
+    def _rewrite_to_base(self, url: str) -> str:
+        """Ссылки на другие зеркала того же ресурса перенаправляются на текущее"""
+        parsed = urlparse(url)
+        if self.base and parsed.hostname in self._domains and parsed.hostname != self.base:
+            return parsed._replace(netloc=self.base).geturl()
+        return url
+    
+    def _check_mirror_health(self) -> bool:
+        """Переключается на другое зеркало, если текущее стало отвечать с ошибками или медленно"""
+        if len(self._outcomes) >= self.min_samples:
+            error_rate = self._outcomes.count(False) / len(self._outcomes)
+            if error_rate > self.error_rate_threshold:
+                return self._failover(f"доля ошибок {error_rate:.0%}")
+        p90, samples = self._requester.concurrency.latency(self.base, 0.9)
+        if p90 is not None and samples >= self.min_samples and p90 > self.latency_threshold:
+            return self._failover(f"p90 времени ответа {p90:.1f}s", max_latency=p90)
+        return False
+    
+    def _on_ranking_update(self, ranked: list[str]):
+        if self.base not in ranked:
+            self._failover("зеркало не ответило на фоновую проверку")
+    
+    def _failover(self, reason: str, max_latency: Optional[float] = None) -> bool:
+        candidates = self._domain_checker.ranked(exclude=self.base)
+        if max_latency is not None:
+            candidates = [domain for domain in candidates if self._domain_checker.ranking[domain] < max_latency]
+        if not candidates:
+            now = time.monotonic()
+            if self._no_replacement_warned_at is None or now - self._no_replacement_warned_at >= self.NO_REPLACEMENT_WARNING_INTERVAL:
+                self._no_replacement_warned_at = now
+                self.logger.warning(f"Зеркало {self.base} деградировало ({reason}), но замены нет")
+            else:
+                self.logger.debug(f"Зеркало {self.base} деградировало ({reason}), но замены нет")
+            # Судить о зеркале заново по следующим min_samples запросам
+            self._outcomes.clear()
+            self._requester.concurrency.reset_latency(self.base)
+            return False
+        old_base, new_base = self.base, candidates[0]
+        self.logger.warning(f"Переключение с зеркала {old_base} на {new_base}: {reason}")
+        self.mirror_switches.append({
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'from': old_base,
+            'to': new_base,
+            'reason': reason,
+        })
+        self._set_base(new_base)
+        return True
     
     def _generate_headers(self) -> Dict[str, str]:
         return {
@@ -58,29 +167,68 @@ class RequestDirector:
         self._downloader.session = session
         
     async def open(self):
-        if self._session:
-            await self.close()
+        """Открывает одну долгоживущую сессию на весь запуск; повторный вызов не пересоздаёт её"""
+        if self._session and not self._session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.connection_limit,
+            limit_per_host=self.connection_limit_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
         self._session = aiohttp.ClientSession(
+            connector=connector,
             headers=self._generate_headers(),
             timeout=self.timeout
         ) 
         self._update_sesson(self._session)
     
     async def close(self):
+        self._domain_checker.stop_monitoring()
         if not self._session:
-            raise ValueError()
+            return
         await self._session.close()
         self._session = None            
         self._update_sesson(self._session)
         
     async def get(self, url: str):
-        return await self._requester.get(url)
+        for attempt in range(self.FAILOVER_RETRIES + 1):
+            try:
+                response = await self._requester.get(self._rewrite_to_base(url), headers=self._generate_headers())
+            except PageNotFound:
+                # Зеркало ответило, страницы просто нет — на его здоровье это не влияет
+                raise
+            except ConnectionError:
+                self._outcomes.append(False)
+                # Повтор имеет смысл, только если зеркало сменилось
+                if not self._check_mirror_health() or attempt == self.FAILOVER_RETRIES:
+                    raise
+                continue
+            self._outcomes.append(True)
+            self._check_mirror_health()
+            return response
     
     async def head(self, url: str):
-        return await self._requester.head(url)
+        return await self._requester.head(url, headers=self._generate_headers())
     
     async def download(self, url: str, filename: str):
-        return await self._downloader.download(url=url, filename=filename)
+        return await self._downloader.download(url=self._rewrite_to_base(url), filename=filename, headers=self._generate_headers())
+    
+    def statistics(self) -> dict[str, Any]:
+        """Счётчики работы сетевого слоя за запуск"""
+        statistics = {}
+        if self._requester.cache:
+            statistics['http_cache'] = dict(self._requester.cache.stats)
+        statistics['concurrency'] = self._requester.concurrency.snapshot()
+        statistics['concurrency_changes'] = list(self._requester.concurrency.history)
+        if self._requester.use_proxy and len(self._requester.proxy_pool):
+            statistics['proxies'] = self._requester.proxy_pool.snapshot()
+        statistics['mirror'] = {
+            'base': self.base,
+            'ranking': dict(self._domain_checker.ranking),
+            'switches': list(self.mirror_switches),
+        }
+        return statistics
     
     async def get_available_domain(self, domains: list[str]):
         return await self._domain_checker.get_available_domain(domains)
\ No newline at end of file
@@ -1,11 +1,19 @@
 import asyncio
 import logging
 import aiohttp
-import random
 
-from typing import Optional, Tuple, List
+from typing import Mapping, Optional, List, Union
+
+from application.parsing.exceptions import PageNotFound
+from application.parsing.requester.ConcurrencyController import ConcurrencyController
+from application.parsing.requester.HttpCache import HttpCache
+from application.parsing.requester.ProxyPool import ProxyPool
+from application.parsing.requester.RateLimiter import RateLimiter
 
 class Requester:
+    # Статусы, при которых страницы нет и повтор запроса ничего не даст
+    NOT_FOUND_STATUSES = (404, 410)
+    
     DEFAULT_HEADERS = {
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
         "Accept-Language": "ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7",
@@ -21,20 +29,26 @@ class Requester:
     
     def __init__(
         self,
-        delay_range: Tuple[float, float] = (1.0, 4.0),
+        rate_limiter: Optional[RateLimiter] = None,
         retries: int = 5,
         backoff_factor: float = 0.7,
         use_proxy: bool = False,
-        proxy_pool: Optional[List[str]] = None
+        proxy_pool: Optional[Union[List[str], ProxyPool]] = None,
+        cache: Optional[HttpCache] = None,
+        concurrency: Optional[ConcurrencyController] = None
     ):
         self.logger = logging.getLogger(self.__class__.__name__)
-        self.delay_range = delay_range
+        self.rate_limiter = rate_limiter or RateLimiter()
         self.retries = retries
         self.backoff_factor = backoff_factor
         self.use_proxy = use_proxy
-        self.proxy_pool = proxy_pool or []
+        if isinstance(proxy_pool, ProxyPool):
+            self.proxy_pool = proxy_pool
+        else:
+            self.proxy_pool = ProxyPool(proxy_pool or [])
+        self.cache = cache
+        self.concurrency = concurrency or ConcurrencyController()
         self._session = None
-        self._last_request_time = 0
 
     @property
     def session(self):
@@ -43,48 +57,124 @@ class Requester:
     @session.setter    
     def session(self, session: aiohttp.ClientSession):
         self._session = session
+        if self.use_proxy and len(self.proxy_pool):
+            self.proxy_pool.attach(session)
+    
+    def _get_proxy(self, url: str) -> Optional[str]:
+        return self.proxy_pool.choose(url) if self.use_proxy else None
     
-    async def _get_proxy(self) -> Optional[str]:
-        return random.choice(self.proxy_pool) if self.use_proxy and self.proxy_pool else None
+    @staticmethod
+    def _is_proxy_failure(error: BaseException) -> bool:
+        """Ошибки соединения и таймауты говорят о проблеме прокси, HTTP-статусы сайта — нет"""
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status == 407
+        return isinstance(error, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
 
-    async def _request(self, method: str, url: str) -> str:
+    async def _request(self, method: str, url: str, headers: Optional[dict[str, str]] = None) -> str:
+        text, _, _ = await self._send(method, url, headers)
+        return text
+
+    async def _send(self, method: str, url: str, headers: Optional[dict[str, str]] = None) -> tuple[str, int, Mapping[str, str]]:
+        """Выполняет запрос с повторами и возвращает тело, статус и заголовки ответа"""
         if not self.session: 
             self.logger.exception("Сессия не была установлена!")
             raise ValueError()
         
-        current_time = asyncio.get_event_loop().time()
-        elapsed = current_time - self._last_request_time
-        
-        if elapsed < random.uniform(*self.delay_range):
-            delay = random.uniform(*self.delay_range) - elapsed
-            await asyncio.sleep(max(0, delay))
-        
-        proxy = await self._get_proxy()
         for attempt in range(self.retries):
+            # Прокси выбирается заново на каждую попытку, чтобы не повторять запрос через упавший
+            proxy = self._get_proxy(url)
             try:
-                async with self._session.request(
-                    method, url, proxy=proxy, allow_redirects=True
-                ) as response:
-                    response.raise_for_status()
-                    self._last_request_time = asyncio.get_event_loop().time()
-                    return await response.text()
+                return await self._attempt(method, url, headers, proxy)
             
             except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if isinstance(e, aiohttp.ClientResponseError) and e.status in self.NOT_FOUND_STATUSES:
+                    self.logger.info(f"Страница {url} не найдена ({e.status})")
+                    raise PageNotFound(url, e.status) from e
+                if proxy and self._is_proxy_failure(e):
+                    self.proxy_pool.report_failure(proxy)
                 if attempt < self.retries - 1:
                     await asyncio.sleep(self.backoff_factor * (2 ** attempt))
                     continue
                 self.logger.critical(f"Ответ не был получен спустя {self.retries} попыток обращения к {url}")
                 raise ConnectionError(f"Request failed after {self.retries} attempts") from e
 
-    async def get(self, url: str) -> str:
+    async def _attempt(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[dict[str, str]],
+        proxy: Optional[str],
+    ) -> tuple[str, int, Mapping[str, str]]:
+        """Одна попытка запроса в пределах лимита параллельности хоста"""
+        host = await self.concurrency.acquire(url)
+        loop = asyncio.get_running_loop()
+        try:
+            await self.rate_limiter.wait(url)
+            started_at = loop.time()
+            async with self._session.request(
+                method, url, headers=headers, proxy=proxy, allow_redirects=True
+            ) as response:
+                if response.status in (429, 503):
+                    self.concurrency.on_throttled(host, response.status, response.headers.get('Retry-After'))
+                response.raise_for_status()
+                text = await response.text()
+                latency = loop.time() - started_at
+                self.concurrency.on_success(host, latency)
+                if proxy:
+                    self.proxy_pool.report_success(proxy, latency)
+                return text, response.status, response.headers.copy()
+        except asyncio.TimeoutError:
+            self.concurrency.on_timeout(host)
+            raise
+        finally:
+            await self.concurrency.release(host)
+
+    async def get(self, url: str, headers: Optional[dict[str, str]] = None) -> str:
         self.logger.info(f"Обращение к url {url}")
-        response = await self._request("GET", url)
+        if self.cache:
+            response = await self._cached_get(url, headers)
+        else:
+            response = await self._request("GET", url, headers)
         self.logger.info(f"Успешное получение ответа по GET запросу к {url}")
         return response
     
-    async def head(self, url: str) -> None:
+    async def _cached_get(self, url: str, headers: Optional[dict[str, str]] = None) -> str:
+        """GET через дисковый кэш: свежие записи отдаются без сети, устаревшие перепроверяются условным запросом"""
+        entry = self.cache.get_entry(url)
+        if entry and self.cache.is_fresh(entry):
+            body = await self.cache.read(entry)
+            if body is not None:
+                self.logger.info(f"Ответ для {url} взят из кэша")
+                return body
+        
+        if entry:
+            text, status, response_headers = await self._send("GET", url, {**(headers or {}), **self.cache.conditional_headers(entry)})
+            if status == 304:
+                body = await self.cache.revalidated(entry)
+                if body is not None:
+                    self.logger.info(f"Страница {url} не изменилась, ответ взят из кэша")
+                    return body
+                text, status, response_headers = await self._send("GET", url, headers)
+        else:
+            text, status, response_headers = await self._send("GET", url, headers)
+        
+        if status == 200:
+            await self.cache.store(url, text, response_headers.get('ETag'), response_headers.get('Last-Modified'))
+        return text
+    
+    async def probe(self, url: str, headers: Optional[dict[str, str]] = None) -> None:
+        """
+        Одиночный HEAD-запрос для проверки зеркала: без повторов, мимо регулятора параллельности и ограничителя
+        частоты, чтобы фоновые проверки не занимали слоты и не попадали в замеры задержки рабочих запросов
+        """
+        if not self.session:
+            raise ValueError("Сессия не была установлена!")
+        async with self._session.request("HEAD", url, headers=headers, allow_redirects=True) as response:
+            response.raise_for_status()
+
+    async def head(self, url: str, headers: Optional[dict[str, str]] = None) -> None:
         """Выполняет HEAD-запрос для проверки доступности"""
         self.logger.info(f"HEAD запрос к {url}")
-        response = await self._request("HEAD", url)
+        response = await self._request("HEAD", url, headers)
         self.logger.info(f"Успешный HEAD для {url}")
         return response
@@ -2,6 +2,11 @@
 from application.parsing.requester.UrlBuilders.UrlBuilder import UrlBuilder
 
 class HMangaUrlBuilder(UrlBuilder):
+    # Тип у всех карточек источника один, фильтровать на сайте имеет смысл только по тегам
+    FILTER_TEMPLATES = {
+        'tags': "/tags/{value}",
+    }
+    
     def __init__(
         self,
         base_domain: str=None
@@ -14,4 +19,4 @@ class HMangaUrlBuilder(UrlBuilder):
         page_number: int
     ) -> str:
         if not self.base: raise Exception() 
-        return f"https://{self._base}/manga/newest/?offset={(page_number-1) * 20}"
\ No newline at end of file
+        return f"https://{self._base}{self._filtered_catalog_path('/manga/newest/')}?offset={(page_number-1) * 20}"
\ No newline at end of file
@@ -1,16 +1,22 @@
 from application.parsing.requester.UrlBuilders.UrlBuilder import UrlBuilder
 
 class MangaUrlBuilder(UrlBuilder):
+    FILTER_TEMPLATES = {
+        'tags': "/tags/{value}",
+        'type': "/type/{value}",
+    }
+    # В адресах каталога тип записан латиницей, на карточках — по-русски: адрес берётся из ссылки типа на карточке
+    LEARNED_FILTER_FIELDS = frozenset({'type'})
+    
     def __init__(
         self,
         base_domain: str=None
     ):
         super().__init__(base_domain)
         
-
     def get_collection_page_url(
         self,
         page_number: int
     ) -> str:
         if not self.base: raise Exception() 
-        return f"https://{self._base}/catalog/?offset={(page_number-1) * 20}"
\ No newline at end of file
+        return f"https://{self._base}{self._filtered_catalog_path('/catalog/')}?offset={(page_number-1) * 20}"
\ No newline at end of file
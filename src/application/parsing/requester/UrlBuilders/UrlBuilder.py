@@ -1,11 +1,24 @@
 import abc
+from typing import Optional
+from typing import Any
+from urllib.parse import quote, urlparse
 
 class UrlBuilder:
+    # Поле карточки → путь каталога, который сайт сам фильтрует по значению этого поля
+    FILTER_TEMPLATES: dict[str, str] = {}
+    # Поля, значение которых в адресе каталога из названия не выводится: оно берётся
+    # из ссылок на отфильтрованный каталог, которые парсер кладёт в карточку полем '<поле>_url'
+    LEARNED_FILTER_FIELDS: frozenset[str] = frozenset()
+    
     def __init__(
         self,
         base_domain: str=None
     ):
         self._base = base_domain
+        # (поле, значение), по которому каталог фильтрует сайт; None — полный каталог
+        self.catalog_filter: Optional[tuple[str, str]] = None
+        # Поле → {название в нижнем регистре: значение для адреса каталога}
+        self._filter_slugs: dict[str, dict[str, str]] = {}
         
     @property
     def base(self) -> str:
@@ -24,6 +37,36 @@ class UrlBuilder:
             return path
         else: return self.base + "/" + path.lstrip('/')
     
+    def filter_value(self, field: str, value: str) -> Optional[str]:
+        """Значение фильтра в том виде, в каком его ждёт адрес каталога, или None, если по нему сайт не фильтрует"""
+        if field not in self.FILTER_TEMPLATES:
+            return None
+        if field in self.LEARNED_FILTER_FIELDS:
+            return self._filter_slugs.get(field, {}).get(value.strip().casefold())
+        return quote(value.strip().replace(' ', '_'))
+    
+    def observe_cards(self, cards: list[dict[str, Any]]):
+        """Запоминает значения для адреса каталога по ссылкам карточек, например /type/manhwa у карточки с типом «Манхва»"""
+        for field in self.LEARNED_FILTER_FIELDS:
+            prefix = self.FILTER_TEMPLATES[field].split("{value}")[0]
+            for card in cards:
+                name, url = card.get(field), card.get(f"{field}_url")
+                if not isinstance(name, str) or not url:
+                    continue
+                path = urlparse(url).path
+                if path.startswith(prefix) and (slug := path[len(prefix):].strip('/')):
+                    self._filter_slugs.setdefault(field, {})[name.strip().casefold()] = slug
+    
+    def catalog_path(self, field: str, value: str) -> Optional[str]:
+        """Путь отфильтрованного сайтом каталога или None"""
+        slug = self.filter_value(field, value)
+        return self.FILTER_TEMPLATES[field].format(value=slug) if slug else None
+    
+    def _filtered_catalog_path(self, default: str) -> str:
+        if self.catalog_filter:
+            return self.catalog_path(*self.catalog_filter) or default
+        return default
+    
     @abc.abstractmethod
     def get_collection_page_url(
         self,
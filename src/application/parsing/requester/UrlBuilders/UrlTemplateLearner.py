@@ -0,0 +1,102 @@
+import logging
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+class UrlTemplateLearner:
+    def __init__(self, sample_size: int = 5, max_misses: int = 3):
+        """
+        Выводит ссылку на страницу загрузок из ссылки на страницу манги, чтобы не запрашивать страницу манги.
+
+        Шаблон — замена начала пути при общем хвосте: /manga/123-title.html → /download/123-title.html.
+        Пока шаблон не проверен, ссылки берутся со страниц манги, а каждая пара сверяется с предсказанием.
+
+        :param sample_size: сколько пар подряд шаблон должен угадать, прежде чем им начнут пользоваться
+        :param max_misses: после стольких расхождений подряд со ссылками со страниц манги шаблон изучается заново
+        """
+        self.sample_size = sample_size
+        self.max_misses = max_misses
+        self._rule: Optional[tuple[str, str]] = None
+        self._matches = 0
+        self._misses = 0
+        self.stats = {'observed': 0, 'predicted': 0, 'missed': 0, 'resets': 0}
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def verified(self) -> bool:
+        return self._rule is not None and self._matches >= self.sample_size
+
+    @staticmethod
+    def _path(url: str) -> str:
+        parts = urlsplit(url)
+        return parts.path + (f"?{parts.query}" if parts.query else "")
+
+    @staticmethod
+    def _infer_rule(page_path: str, download_path: str) -> Optional[tuple[str, str]]:
+        """Пара (начало пути страницы манги, начало пути страницы загрузок) при общем хвосте из целых сегментов"""
+        common = 0
+        limit = min(len(page_path), len(download_path))
+        while common < limit and page_path[-common - 1] == download_path[-common - 1]:
+            common += 1
+        tail = page_path[len(page_path) - common:]
+        # Хвост должен начинаться с границы сегмента, иначе /read/1 → /dl/1 дало бы правило /rea → /
+        slash = tail.find('/')
+        if slash < 0:
+            return None
+        tail = tail[slash:]
+        return page_path[:len(page_path) - len(tail)], download_path[:len(download_path) - len(tail)]
+
+    def _apply(self, page_url: str) -> Optional[str]:
+        if self._rule is None:
+            return None
+        page_prefix, download_prefix = self._rule
+        path = self._path(page_url)
+        if not path.startswith(page_prefix) or not path[len(page_prefix):].startswith('/'):
+            return None
+        predicted = download_prefix + path[len(page_prefix):]
+        parts = urlsplit(page_url)
+        return f"{parts.scheme}://{parts.netloc}{predicted}" if parts.netloc else predicted
+
+    def predict(self, page_url: str) -> Optional[str]:
+        """Ссылка на страницу загрузок по проверенному шаблону или None"""
+        if not self.verified:
+            return None
+        predicted = self._apply(page_url)
+        if predicted:
+            self.stats['predicted'] += 1
+        return predicted
+
+    def observe(self, page_url: str, download_page_url: str):
+        """
+        Пара ссылок, полученная со страницы манги, подтверждает текущий шаблон или опровергает его.
+        Проверенный шаблон заменяется только после max_misses расхождений подряд, непроверенный — сразу.
+        """
+        self.stats['observed'] += 1
+        page_parts, download_parts = urlsplit(page_url), urlsplit(download_page_url)
+        if download_parts.netloc and download_parts.netloc != page_parts.netloc:
+            # Загрузки на другом хосте шаблоном пути не описать
+            return
+        predicted = self._apply(page_url)
+        if predicted and self._path(predicted) == self._path(download_page_url):
+            self._matches += 1
+            self._misses = 0
+            if self._matches == self.sample_size:
+                self.logger.info(f"Шаблон ссылок на страницы загрузок проверен: {self._rule[0]}/… → {self._rule[1]}/…")
+            return
+        if self.verified:
+            self.stats['missed'] += 1
+            self._misses += 1
+            self.logger.info(f"Ссылка на страницу загрузок для {page_url} не совпала с шаблоном")
+            if self._misses < self.max_misses:
+                return
+            self.logger.warning("Шаблон ссылок на страницы загрузок перестал работать и будет изучен заново")
+            self.stats['resets'] += 1
+        self._rule = self._infer_rule(self._path(page_url), self._path(download_page_url))
+        self._matches = 1 if self._rule else 0
+        self._misses = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            'rule': list(self._rule) if self._rule else None,
+            'verified': self.verified,
+            **self.stats,
+        }
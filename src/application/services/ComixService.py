@@ -39,10 +39,15 @@ class ComixService:
         uploader_names: Optional[List[str]] = None,
         include_tags: Optional[List[str]] = None,
         except_tags: Optional[List[str]] = None,
+        types: Optional[List[str]] = None,
+        incremental: bool = False,
     ) -> Dict[str, Any]:
         """
         Основной метод запуска парсинга.
 
+        В инкрементальном режиме обход каталога (он отсортирован от новых к старым) прекращается,
+        как только встречена карточка-ориентир прошлого обхода или целая страница уже известных карточек.
+
         Возвращает словарь с краткой статистикой по результату.
         """
         author_names = author_names or []
@@ -50,6 +55,7 @@ class ComixService:
         uploader_names = uploader_names or []
         include_tags = include_tags or []
         except_tags = except_tags or []
+        types = types or []
 
         self.logger.info("Старт парсинга источника %s", source)
 
@@ -61,6 +67,7 @@ class ComixService:
             uploader_names=uploader_names,
             include_tags=include_tags,
             except_tags=except_tags,
+            types=types,
         )
 
         async with self._unit_of_work:
@@ -72,12 +79,28 @@ class ComixService:
 
             total_saved = 0
             total_processed = 0
+            total_failed = 0
+            statistics = {}
+            newest_card_url = None
+            watermark = None
+            if incremental:
+                watermark = await self._unit_of_work.parsing_sessions.get_last_watermark(parsing_source.id)
+                self.logger.info("Инкрементальный обход, ориентир прошлого обхода: %s", watermark)
+
+            async def on_collection_page(cards: List[Dict[str, Any]]) -> bool:
+                nonlocal newest_card_url
+                if newest_card_url is None and cards:
+                    newest_card_url = cards[0].get('page_url')
+                return incremental and await self._reached_known_cards(cards, watermark)
 
             try:
                 async for parsed_cards_from_collection_page in comix_bee.parse(
                     start_page=start_page,
                     end_page=end_page,
-                    filter_pipeline=filter_pipeline
+                    filter_pipeline=filter_pipeline,
+                    should_stop=on_collection_page,
+                    start_date=start_date,
+                    end_date=end_date,
                 ):
                     total_processed += len(parsed_cards_from_collection_page)
                     cards_to_download_content = await self._filter_existing_and_missing_content(parsed_cards_from_collection_page)
@@ -86,11 +109,16 @@ class ComixService:
                         self.logger.info("Нет новых карточек для обработки на этой странице.")
                         continue
 
-                    saved_count = await self._process_and_save_cards(cards_to_download_content, parsing_session, comix_bee)
+                    saved_count, failed_count = await self._process_and_save_cards(cards_to_download_content, parsing_session, comix_bee)
                     total_saved += saved_count
+                    total_failed += failed_count
 
                     await self._unit_of_work.commit()
 
+                if newest_card_url and self._covers_catalog_head(comix_bee.last_crawl, filter_pipeline, end_page, total_failed):
+                    parsing_session.watermark = newest_card_url
+                    self._unit_of_work.parsing_sessions.update(parsing_session)
+
             except ParsingException as ex:
                 self.logger.warning("Произошла ошибка парсинга страницы типа '%s'.", ex.page_type, exc_info=False)
             except NoOneAvailableDomen:
@@ -102,20 +130,133 @@ class ComixService:
             finally:
                 try:
                     await self._unit_of_work.commit()
-                    await comix_bee._request_director.close()
+                    await comix_bee.close()
                     self.logger.info(
-                        "Парсинг завершён. Обработано карточек: %s, сохранено новых записей: %s, источник: %s",
-                        total_processed, total_saved, parsing_source.name
+                        "Парсинг завершён. Обработано карточек: %s, сохранено новых записей: %s, ошибок: %s, источник: %s",
+                        total_processed, total_saved, total_failed, parsing_source.name
                     )
+                    statistics = comix_bee.statistics()
+                    if 'http_cache' in statistics:
+                        self.logger.info(
+                            "HTTP кэш: попаданий %(hits)s, промахов %(misses)s, перепроверок %(revalidations)s, вытеснено %(evictions)s",
+                            statistics['http_cache']
+                        )
+                    for host, state in statistics.get('concurrency', {}).items():
+                        self.logger.info(
+                            "Лимит параллельных запросов к %s: %s (p50 %s, p90 %s), изменений лимита: %s",
+                            host, state['limit'], state['p50'], state['p90'],
+                            sum(1 for change in statistics['concurrency_changes'] if change['host'] == host)
+                        )
+                    for switch in statistics.get('mirror', {}).get('switches', []):
+                        self.logger.info("Смена зеркала %(from)s → %(to)s в %(time)s: %(reason)s", switch)
+                    for name, stats in statistics.get('filters', {}).items():
+                        self.logger.info(
+                            "Фильтр %s: в замерах проверено %s, прошло %s (%s), стоимость %s мкс",
+                            name, stats['evaluated'], stats['passed'], stats['pass_rate'], stats['cost_us']
+                        )
+                    if 'download_url_prediction' in statistics:
+                        self.logger.info(
+                            "Ссылки на страницы загрузок: предсказано %(predicted)s, промахов %(missed)s, шаблон %(rule)s",
+                            statistics['download_url_prediction']
+                        )
                 except Exception:
                     self.logger.exception("Ошибка при финальном коммите.", exc_info=False)
 
             return {
                 "processed_cards": total_processed,
                 "saved_works": total_saved,
-                "source": parsing_source.name
+                "failed_cards": total_failed,
+                "source": parsing_source.name,
+                **statistics,
             }
 
+    async def filter_stored(
+        self,
+        author_names: Optional[List[str]] = None,
+        translator_names: Optional[List[str]] = None,
+        include_tags: Optional[List[str]] = None,
+        except_tags: Optional[List[str]] = None,
+        types: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Отбирает из уже сохранённых работ те, что проходят фильтры, без обращения к источникам.
+        Весь локальный каталог проверяется одним пакетом по столбцам (CardColumns),
+        а если NumPy недоступен — построчно. Даты загрузки у сохранённых работ нет, поэтому фильтра по периоду нет.
+
+        Возвращает словарь с числом проверенных работ и названиями прошедших фильтр.
+        """
+        filter_pipeline = self._cfilter_builder.build(
+            author_names=author_names or [],
+            translator_names=translator_names or [],
+            include_tags=include_tags or [],
+            except_tags=except_tags or [],
+            types=types or [],
+        )
+        async with self._unit_of_work:
+            works = await self._unit_of_work.comics.get_all()
+        cards = [self._work_to_card(work) for work in works]
+
+        columns = filter_pipeline.columns(cards)
+        if columns is None:
+            mask = filter_pipeline.apply_many(cards)
+        else:
+            mask = filter_pipeline.apply_columns(columns).tolist()
+        titles = [card['title'] for card, passed in zip(cards, mask) if passed]
+        self.logger.info("Проверено сохранённых работ: %s, прошло фильтр: %s", len(cards), len(titles))
+        return {"checked_works": len(cards), "titles": titles}
+
+    @staticmethod
+    def _work_to_card(work: Work) -> Dict[str, Any]:
+        """Сохранённая работа в виде карточки каталога — в том виде, который проверяют фильтры"""
+        return {
+            'title': work.title,
+            'type': work.type,
+            'page_url': work.page_url,
+            'authors': [{'name': author.name} for author in work.authors or []],
+            'translators': [{'name': translator.name} for translator in work.translators or []],
+            'tags': [{'name': tag.name} for tag in work.tags or []],
+        }
+
+    def _covers_catalog_head(self, crawl: Dict[str, Any], filter_pipeline, end_page: Optional[int], failed: int) -> bool:
+        """
+        Ориентир можно сохранить, только если обход без пропусков покрыл каталог от первой страницы
+        до ориентира прошлого обхода (или уже сохранённых карточек) либо до конца каталога:
+        иначе между ним и сохранёнными карточками останется дыра, которую следующий инкрементальный обход не заметит.
+        Фильтры (в том числе по датам) и end_page обход обрезают, пропущенные страницы и карточки с ошибками — тоже.
+        """
+        reasons = []
+        if crawl.get('stopped_by') not in ('should_stop', 'catalog_end'):
+            reasons.append(f"обход остановлен: {crawl.get('stopped_by')}")
+        if crawl.get('start_page', 0) > 1:
+            reasons.append(f"обход начат со страницы {crawl['start_page']}")
+        if end_page is not None:
+            reasons.append(f"задана конечная страница {end_page}")
+        if filter_pipeline.filters:
+            reasons.append("заданы фильтры")
+        if crawl.get('catalog_filter'):
+            # Отфильтрованный сайтом каталог — не начало полного каталога, даже если локальных фильтров не осталось
+            reasons.append(f"каталог отфильтрован сайтом по {crawl['catalog_filter']}")
+        if crawl.get('skipped_pages'):
+            reasons.append(f"пропущены страницы {crawl['skipped_pages']}")
+        if failed:
+            reasons.append(f"не обработано карточек: {failed}")
+        if reasons:
+            self.logger.info("Ориентир обхода не сохраняется: %s", ", ".join(reasons))
+        return not reasons
+
+    async def _reached_known_cards(self, cards: List[Dict[str, Any]], watermark: Optional[str]) -> bool:
+        """Страница содержит ориентир прошлого обхода или состоит только из уже сохранённых карточек"""
+        if not cards:
+            return False
+        if watermark and any(card.get('page_url') == watermark for card in cards):
+            self.logger.info("Найдена карточка-ориентир прошлого обхода: %s", watermark)
+            return True
+        for card in cards:
+            if not card.get('title') or not await self._unit_of_work.comics.get_by_field('title', card['title']):
+                return False
+        self.logger.info("Все карточки страницы уже сохранены")
+        return True
+
     async def _filter_existing_and_missing_content(self, parsed_cards: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Для каждой карточки проверяет есть ли запись в БД.
@@ -159,7 +300,7 @@ class ComixService:
         """
         Парсит по каждой карточке полную информацию (через comix_bee.parse_card),
         скачивает файлы, создаёт Work и добавляет в UnitOfWork.
-        Возвращает количество успешно добавленных Works.
+        Возвращает количество успешно добавленных Works и карточек, которые обработать не удалось.
         """
         saved = 0
 
@@ -178,7 +319,8 @@ class ComixService:
         except Exception:
             self.logger.exception("Критическая ошибка при разборе карточек через comix_bee.parse_card", exc_info=False)
 
-        return saved
+        # Неудачными считаются и карточки, которые parse_card пропустил
+        return saved, len(cards) - saved
 
     async def _create_work_from_parsed_card(self, parsed_card: Dict[str, Any], parsing_session: ParsingSession) -> Work:
         """
@@ -0,0 +1,88 @@
+"""
+Замер обслуживания индексов InMemoryCache на больших кэшах.
+
+Для кэшей разного размера замеряется среднее время на операцию:
+смена индексированного поля объекта (уведомление кэша и перестройка индекса),
+contains для объекта без id и put с перезаписью ключа.
+При обратных отображениях объект → ключ время не должно расти с размером кэша.
+
+Запуск из каталога src:
+    python -m benchmarks.cache [--sizes 1000 10000 100000] [--operations N]
+"""
+import argparse
+import random
+import sys
+import time
+
+from domain.cache.InMemoryCache import InMemoryCache
+from domain.cache.IndexNotifiable import IndexNotifiable, indexed
+
+class Entry(IndexNotifiable):
+    """Сущность с индексированным полем, которая уведомляет кэши о его смене"""
+    def __init__(self, key: int, name: str):
+        super().__init__()
+        self.key = key
+        self._name = name
+
+    @indexed
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @name.setter
+    def name(self, value: str):
+        old_value, self._name = self._name, value
+        self._notify_index_changed('name', old_value, value)
+
+class Unsaved:
+    """Объект без id: contains ищет его не по ключу"""
+
+def fill(size: int) -> tuple[InMemoryCache, list[Entry]]:
+    cache = InMemoryCache()
+    entries = [Entry(key, f"name-{key}") for key in range(size)]
+    for entry in entries:
+        cache.put(entry.key, entry)
+    return cache, entries
+
+def per_operation(run, operations: int) -> float:
+    started_at = time.perf_counter()
+    run()
+    return (time.perf_counter() - started_at) / operations
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="размеры кэша")
+    arg_parser.add_argument("--operations", type=int, default=2_000, help="сколько операций каждого вида замерять")
+    args = arg_parser.parse_args()
+    rng = random.Random(1)
+
+    print(f"{'записей':>10}{'смена поля, мкс':>18}{'contains, мкс':>16}{'перезапись, мкс':>18}")
+    for size in args.sizes:
+        cache, entries = fill(size)
+        sample = [rng.choice(entries) for _ in range(args.operations)]
+
+        def rename():
+            for i, entry in enumerate(sample):
+                entry.name = f"{entry.name}/{i}"
+
+        change_time = per_operation(rename, args.operations)
+        for entry in sample:
+            if cache.get_by('name', entry.name) is not entry:
+                print(f"Индекс не обновился для записи {entry.key}")
+                return 1
+
+        missing = [Unsaved() for _ in range(args.operations)]
+        contains_time = per_operation(
+            lambda: [cache.contains(entry) for entry in sample] and [cache.contains(value) for value in missing],
+            2 * args.operations,
+        )
+        if any(cache.contains(value) is not None for value in missing[:10]):
+            print("contains нашёл объект, которого нет в кэше")
+            return 1
+
+        put_time = per_operation(lambda: [cache.put(entry.key, entry) for entry in sample], args.operations)
+        print(f"{size:>10}{change_time * 1e6:>18.2f}{contains_time * 1e6:>16.2f}{put_time * 1e6:>18.2f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Загрузка сохранённых HTML страниц для проверки и замеров парсеров.
+
+Страницы берутся из каталога с файлами вида <каталог>/<источник>/<PageType.name>/<имя>.html,
+например fixtures/mangachan/collection_page/catalog_1.html (по умолчанию — набор страниц
+рядом с этим модулем), или из документной БД (таблицы parsing_attempts и html_pages TinyDB).
+В документной БД источник страниц не записан, поэтому его нужно указать явно.
+"""
+from pathlib import Path
+from typing import Any, Optional
+
+from tinydb import TinyDB
+
+from domain.entities.documents.HtmlPage import HtmlPage
+from domain.enums import PageType
+
+DEFAULT_DDB_PATH = Path(__file__).resolve().parents[1] / "persistance" / "db" / "document_db.json"
+DEFAULT_FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+ATTEMPT_PAGE_FIELDS = {
+    'collection_page_id': PageType.collection_page,
+    'page_id': PageType.page,
+    'download_page_id': PageType.download_page,
+}
+
+def load_corpus(
+    ddb_path: Optional[Path] = None,
+    fixtures_dir: Optional[Path] = None,
+    source: Optional[str] = None,
+) -> list[dict[str, Any]]:
+    """
+    Возвращает список страниц {'name': str, 'source': str, 'page_type': PageType, 'html': str}.
+    Если указан ddb_path, страницы читаются из документной БД и помечаются источником source,
+    иначе из fixtures_dir (по умолчанию DEFAULT_FIXTURES_DIR) — только источника source, если он указан.
+    """
+    if ddb_path:
+        if not source:
+            raise ValueError("Для страниц из документной БД нужно указать источник")
+        return _load_document_db(Path(ddb_path), source)
+    pages = _load_fixtures(Path(fixtures_dir or DEFAULT_FIXTURES_DIR))
+    return [page for page in pages if page['source'] == source] if source else pages
+
+def _load_fixtures(fixtures_dir: Path) -> list[dict[str, Any]]:
+    pages = []
+    for source_dir in sorted(path for path in fixtures_dir.iterdir() if path.is_dir()):
+        for page_type in PageType:
+            for path in sorted((source_dir / page_type.name).glob("*.html")):
+                pages.append({
+                    'name': f"{source_dir.name}/{page_type.name}/{path.name}",
+                    'source': source_dir.name,
+                    'page_type': page_type,
+                    'html': path.read_text(encoding='utf-8', errors='replace'),
+                })
+    return pages
+
+def _load_document_db(ddb_path: Path, source: str) -> list[dict[str, Any]]:
+    if not ddb_path.exists():
+        return []
+    db = TinyDB(ddb_path, access_mode='r')
+    try:
+        html_pages = db.table('html_pages')
+        pages = []
+        seen = set()
+        for attempt in db.table('parsing_attempts').all():
+            for field, page_type in ATTEMPT_PAGE_FIELDS.items():
+                doc_id = attempt.get(field)
+                if doc_id is None or doc_id in seen:
+                    continue
+                doc = html_pages.get(doc_id=doc_id)
+                if not doc:
+                    continue
+                seen.add(doc_id)
+                page = HtmlPage.from_dict(doc)
+                pages.append({
+                    'name': page.url,
+                    'source': source,
+                    'page_type': page_type,
+                    'html': page.content.decode(page.encoding or 'utf-8', errors='replace'),
+                })
+        return pages
+    finally:
+        db.close()
@@ -0,0 +1,130 @@
+"""
+Замер фильтрации карточек CFilterPipeline на больших списках.
+
+Сравнивается собранный плоский предикат пайплайна с прежней схемой: фильтры-лямбды,
+вложенные через CFilter.__and__, с поиском по спискам. Если установлен NumPy, замеряется и
+столбцовая фильтрация: отдельно построение столбцов и повторная фильтрация по готовым столбцам.
+Пакетами по размеру страницы каталога сравнивается проверка фильтров в заявленном порядке
+и с адаптивным переупорядочиванием по замеренной статистике.
+Карточки генерируются с фиксированным зерном, так что запуски сравнимы между собой.
+
+Запуск из каталога src:
+    python -m benchmarks.filters [--cards N] [--repeat N] [--seed N] [--page-size N]
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from typing import Any
+
+from domain.filters.CFilterBuilder import CFilterBuilder
+from domain.filters.CFilterPipeline import CFilterPipeline
+from domain.filters.Filter import CFilter
+
+TAGS = [f"тег {i}" for i in range(120)]
+AUTHORS = [f"Автор {i}" for i in range(5000)]
+
+QUERY = {
+    'start_date': date(2023, 1, 1),
+    'end_date': date(2024, 6, 30),
+    'author_names': AUTHORS[:2500],
+    'include_tags': TAGS[:1],
+    'except_tags': TAGS[100:110],
+}
+
+def generate_cards(count: int, seed: int) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    first_day = date(2020, 1, 1)
+    cards = []
+    for i in range(count):
+        card = {
+            'title': f"Манга {i}",
+            'page_url': f"/manga/{i}-title.html",
+            'authors': [{'name': rng.choice(AUTHORS), 'url': None} for _ in range(rng.randint(0, 3))],
+            'tags': [{'name': tag} for tag in rng.sample(TAGS, rng.randint(0, 12))],
+            'upload_date': first_day + timedelta(days=rng.randint(0, 5 * 365)),
+        }
+        # Часть карточек без даты: она не разобралась
+        if i % 50 == 0:
+            card['upload_date'] = None
+        cards.append(card)
+    return cards
+
+def legacy_pipeline(query: dict[str, Any]) -> CFilter:
+    """Фильтры в прежнем виде: лямбды по спискам, каждая обёрнута в CFilter и вложена через &"""
+    start, end = query['start_date'], query['end_date']
+    authors, include_tags, except_tags = list(query['author_names']), list(query['include_tags']), list(query['except_tags'])
+    filters = [
+        CFilter(lambda c: start <= c['upload_date'] and c['upload_date'] <= end),
+        CFilter(lambda c: any(a['name'] in authors for a in c['authors'])),
+        CFilter(lambda c: all(tag in [t['name'] for t in c['tags']] for tag in include_tags)),
+        CFilter(lambda c: all(t['name'] not in except_tags for t in c['tags'])),
+    ]
+    combined = CFilter(lambda c: True)
+    for f in reversed(filters):
+        combined = combined & f
+    return combined
+
+def measure(run, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started_at)
+    return best
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--cards", type=int, default=200_000, help="сколько карточек фильтровать")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="сколько раз повторять замер (берётся лучший)")
+    arg_parser.add_argument("--seed", type=int, default=1, help="зерно генератора карточек")
+    arg_parser.add_argument("--page-size", type=int, default=20, help="карточек на странице каталога")
+    args = arg_parser.parse_args()
+
+    cards = generate_cards(args.cards, args.seed)
+    pipeline: CFilterPipeline = CFilterBuilder().build(**QUERY)
+    legacy = legacy_pipeline(QUERY)
+
+    expected = [legacy.apply(card) for card in cards]
+    if pipeline.apply_many(cards) != expected:
+        print("Результат собранного пайплайна отличается от прежней схемы")
+        return 1
+
+    legacy_time = measure(lambda: [legacy.apply(card) for card in cards], args.repeat)
+    static = CFilterBuilder().build(**QUERY)
+    static.adaptive = False
+    compiled_time = measure(lambda: static.apply_many(cards), args.repeat)
+    timings = [("вложенные лямбды", legacy_time), ("плоский предикат", compiled_time)]
+
+    pages = [cards[i:i + args.page_size] for i in range(0, len(cards), args.page_size)]
+    adaptive = CFilterBuilder().build(**QUERY)
+    if [flag for page in pages for flag in adaptive.apply_many(page)] != expected:
+        print("Результат адаптивного пайплайна отличается от прежней схемы")
+        return 1
+    timings.append(("страницы: порядок задан", measure(lambda: [static.apply_many(page) for page in pages], args.repeat)))
+    timings.append(("страницы: адаптивно", measure(lambda: [adaptive.apply_many(page) for page in pages], args.repeat)))
+
+    columns = pipeline.columns(cards)
+    if columns is None:
+        print("NumPy не установлен, столбцовая фильтрация не замеряется")
+    else:
+        started_at = time.perf_counter()
+        columnar = pipeline.apply_columns(columns).tolist()
+        timings.append(("столбцы: построение+1", time.perf_counter() - started_at))
+        if columnar != expected:
+            print("Результат столбцовой фильтрации отличается от построчной")
+            return 1
+        timings.append(("столбцы: готовые", measure(lambda: pipeline.apply_columns(columns), args.repeat)))
+
+    print(f"карточек: {len(cards)}, прошло фильтр: {sum(expected)}")
+    print(f"{'схема':<26}{'всего, мс':>12}{'карточек/с':>14}{'ускорение':>11}")
+    for name, elapsed in timings:
+        print(f"{name:<26}{elapsed * 1000:>12.1f}{len(cards) / elapsed:>14.0f}{legacy_time / elapsed:>10.1f}x")
+    print("Статистика фильтров (в выбранном порядке):")
+    for name, stats in adaptive.statistics().items():
+        print(f"  {name:<28}прошло {stats['pass_rate']:.3f}, {stats['cost_us']:.3f} мкс")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
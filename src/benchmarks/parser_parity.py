@@ -0,0 +1,97 @@
+"""
+Проверка, что бэкенды парсинга HTML дают одинаковый результат.
+
+Парсер каждого источника прогоняется по сохранённым страницам этого источника с BeautifulSoup (эталон)
+и с проверяемым бэкендом; любое расхождение в результате или в типе ошибки выводится.
+Код выхода 1, если найдены расхождения.
+
+Запуск из каталога src:
+    python -m benchmarks.parser_parity --backend lxml [--source mangachan] [--fixtures DIR | --ddb [PATH]]
+"""
+import argparse
+import logging
+import sys
+from typing import Any
+
+from application.parsing.exceptions import InvalidHTMLPage, ParsingException
+from application.parsing.parser.HMangaParser import HMangaParser
+from application.parsing.parser.MangaChanParser import MangaChanParser
+from application.parsing.parser.backends.factory import create_backend
+from benchmarks.corpus import DEFAULT_DDB_PATH, load_corpus
+from domain.enums import PageType
+
+# Источник страниц (каталог в fixtures) → парсер этого источника
+SOURCE_PARSERS = {
+    'mangachan': MangaChanParser,
+    'hmanga': HMangaParser,
+}
+
+PAGE_METHODS = {
+    PageType.collection_page: 'parse_collection_page',
+    PageType.page: 'parse_manga_page',
+    PageType.download_page: 'parse_download_page',
+}
+
+def parse_outcome(parser, page: dict[str, Any]) -> Any:
+    """Результат разбора страницы или имя исключения, если разбор не удался"""
+    try:
+        return getattr(parser, PAGE_METHODS[page['page_type']])(page['html'])
+    except (Exception, ParsingException, InvalidHTMLPage) as ex:
+        return f"<{type(ex).__name__}>"
+
+def failed(outcome: Any) -> bool:
+    """parse_outcome закончился исключением"""
+    return isinstance(outcome, str) and outcome.startswith("<")
+
+def add_corpus_arguments(arg_parser: argparse.ArgumentParser):
+    arg_parser.add_argument("--source", choices=sorted(SOURCE_PARSERS), help="только страницы этого источника")
+    arg_parser.add_argument("--fixtures", help="каталог с HTML файлами <источник>/<PageType.name>/*.html")
+    arg_parser.add_argument(
+        "--ddb", nargs="?", const=str(DEFAULT_DDB_PATH),
+        help="документная БД TinyDB вместо HTML файлов (нужен --source)",
+    )
+
+def pages_by_source(args: argparse.Namespace) -> dict[str, list[dict[str, Any]]]:
+    """Страницы, сгруппированные по источнику; страницы источников без парсера пропускаются с предупреждением"""
+    grouped: dict[str, list[dict[str, Any]]] = {}
+    for page in load_corpus(ddb_path=args.ddb, fixtures_dir=args.fixtures, source=args.source):
+        if page['source'] not in SOURCE_PARSERS:
+            print(f"Нет парсера для источника {page['source']}, страница {page['name']} пропущена")
+            continue
+        grouped.setdefault(page['source'], []).append(page)
+    return grouped
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--backend", default="lxml", help="проверяемый бэкенд")
+    add_corpus_arguments(arg_parser)
+    args = arg_parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    if create_backend(args.backend).name != args.backend:
+        print(f"Бэкенд {args.backend} недоступен")
+        return 2
+    grouped = pages_by_source(args)
+    if not grouped:
+        print("Нет сохранённых страниц для проверки")
+        return 2
+
+    mismatches = 0
+    for source, pages in grouped.items():
+        parser_class = SOURCE_PARSERS[source]
+        reference = parser_class(backend="soup")
+        candidate = parser_class(backend=args.backend)
+        for page in pages:
+            expected = parse_outcome(reference, page)
+            actual = parse_outcome(candidate, page)
+            if expected != actual:
+                mismatches += 1
+                print(f"[{parser_class.__name__}] {page['name']}: расхождение")
+                print(f"  soup: {expected!r}")
+                print(f"  {args.backend}: {actual!r}")
+        print(f"{parser_class.__name__} ({source}): проверено страниц {len(pages)}")
+    print(f"Расхождений: {mismatches}")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
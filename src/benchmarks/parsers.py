@@ -0,0 +1,168 @@
+"""
+Бенчмарк парсеров на сохранённых страницах.
+
+Для каждого источника (его парсер разбирает только его страницы), бэкенда и типа страницы
+считает страниц в секунду, p50/p99 времени разбора одной страницы и пиковую память (tracemalloc).
+Страницы, разбор которых заканчивается ошибкой, в замер не попадают: их число пишется отдельно.
+Результат пишется в JSON вместе с коммитом и отпечатком набора страниц, чтобы запуски на разных
+коммитах можно было сравнивать. С --baseline сравнивает результат с прошлым запуском
+(по умолчанию — baseline_parsers.json, снятый на страницах из fixtures) и завершается с кодом 1,
+если производительность упала больше чем на --threshold процентов.
+
+Запуск из каталога src:
+    python -m benchmarks.parsers [--source mangachan] [--fixtures DIR | --ddb [PATH]] [--backend soup lxml]
+                                 [--repeat N] [--output FILE] [--baseline [FILE]] [--threshold 10]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from application.parsing.parser.backends.factory import create_backend
+from benchmarks.parser_parity import SOURCE_PARSERS, add_corpus_arguments, failed, pages_by_source, parse_outcome
+from domain.enums import PageType
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline_parsers.json"
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def corpus_fingerprint(pages: list[dict[str, Any]]) -> str:
+    digest = hashlib.sha256()
+    for page in sorted(pages, key=lambda page: page['name']):
+        digest.update(page['name'].encode('utf-8'))
+        digest.update(page['html'].encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+def run_case(parser, pages: list[dict[str, Any]], repeat: int) -> dict[str, float]:
+    # Прогрев: первые вызовы компилируют регулярные выражения и селекторы
+    for page in pages:
+        parse_outcome(parser, page)
+
+    timings = []
+    for _ in range(repeat):
+        for page in pages:
+            started_at = time.perf_counter()
+            parse_outcome(parser, page)
+            timings.append(time.perf_counter() - started_at)
+
+    # Память замеряется отдельным проходом: tracemalloc сильно замедляет разбор.
+    # Учитываются только объекты Python — дерево libxml2 у бэкенда lxml в замер не попадает
+    tracemalloc.start()
+    for page in pages:
+        parse_outcome(parser, page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'pages': len(pages),
+        'pages_per_sec': len(timings) / sum(timings),
+        'p50_ms': percentile(timings, 0.5) * 1000,
+        'p99_ms': percentile(timings, 0.99) * 1000,
+        'peak_memory_kb': peak / 1024,
+    }
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """Список регрессий: новые ошибки разбора, падение pages/s или рост p99 больше чем на threshold процентов"""
+    if baseline.get('corpus') != results['corpus']:
+        print("Внимание: базовый запуск сделан на другом наборе страниц, сравнение может быть неточным")
+    regressions = []
+    for case, current in results['cases'].items():
+        previous = baseline.get('cases', {}).get(case)
+        if not previous:
+            continue
+        if current.get('failed_pages', 0) > previous.get('failed_pages', 0):
+            regressions.append(f"{case}: страниц с ошибкой разбора {previous.get('failed_pages', 0)} → {current['failed_pages']}")
+        throughput_change = (current['pages_per_sec'] / previous['pages_per_sec'] - 1) * 100
+        p99_change = (current['p99_ms'] / previous['p99_ms'] - 1) * 100
+        if throughput_change < -threshold:
+            regressions.append(f"{case}: pages/s {previous['pages_per_sec']:.1f} → {current['pages_per_sec']:.1f} ({throughput_change:+.1f}%)")
+        if p99_change > threshold:
+            regressions.append(f"{case}: p99 {previous['p99_ms']:.3f} → {current['p99_ms']:.3f} мс ({p99_change:+.1f}%)")
+    return regressions
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_corpus_arguments(arg_parser)
+    arg_parser.add_argument("--backend", nargs="+", default=["soup", "lxml"], help="замеряемые бэкенды")
+    arg_parser.add_argument("--repeat", type=int, default=10, help="сколько раз прогонять каждую страницу")
+    arg_parser.add_argument("--output", help="куда записать результаты (JSON)")
+    arg_parser.add_argument(
+        "--baseline", nargs="?", const=str(DEFAULT_BASELINE),
+        help="результаты прошлого запуска для сравнения (JSON)",
+    )
+    arg_parser.add_argument("--threshold", type=float, default=10.0, help="допустимое ухудшение, проценты")
+    args = arg_parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    grouped = pages_by_source(args)
+    if not grouped:
+        print("Нет сохранённых страниц для замера")
+        return 2
+    pages = [page for source_pages in grouped.values() for page in source_pages]
+
+    results = {
+        'commit': git_commit(),
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'corpus': corpus_fingerprint(pages),
+        'repeat': args.repeat,
+        'cases': {},
+    }
+    print(f"{'случай':<45}{'стр/с':>10}{'p50, мс':>10}{'p99, мс':>10}{'память, КБ':>12}{'ошибок':>8}")
+    for backend in args.backend:
+        if create_backend(backend).name != backend:
+            print(f"Бэкенд {backend} недоступен, пропуск")
+            continue
+        for source, source_pages in grouped.items():
+            parser = SOURCE_PARSERS[source](backend=backend)
+            for page_type in PageType:
+                typed_pages = [page for page in source_pages if page['page_type'] == page_type]
+                parsed_pages = [page for page in typed_pages if not failed(parse_outcome(parser, page))]
+                if not parsed_pages:
+                    continue
+                case = f"{parser.__class__.__name__}/{backend}/{page_type.name}"
+                stats = results['cases'][case] = run_case(parser, parsed_pages, args.repeat)
+                stats['failed_pages'] = len(typed_pages) - len(parsed_pages)
+                print(
+                    f"{case:<45}{stats['pages_per_sec']:>10.1f}{stats['p50_ms']:>10.3f}{stats['p99_ms']:>10.3f}"
+                    f"{stats['peak_memory_kb']:>12.1f}{stats['failed_pages']:>8}"
+                )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"Регрессии относительно {baseline.get('commit')}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"Регрессий относительно {baseline.get('commit')} нет")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
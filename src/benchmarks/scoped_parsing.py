@@ -0,0 +1,69 @@
+"""
+Замер ускорения от разбора только нужного элемента страницы.
+
+Для страниц манги (div.extaraNavi) и загрузок (#download_table) сравнивается
+разбор всей страницы и разбор вырезанного элемента, для каждого источника и доступного бэкенда.
+Перед замером проверяется, что оба разбора дают одинаковый результат на всех страницах;
+страницы, которые не разбираются ни так, ни так, в замер не попадают.
+
+Запуск из каталога src:
+    python -m benchmarks.scoped_parsing [--source mangachan] [--fixtures DIR | --ddb [PATH]] [--repeat N]
+"""
+import argparse
+import logging
+import sys
+import time
+
+from application.parsing.parser.backends.factory import create_backend
+from benchmarks.parser_parity import PAGE_METHODS, SOURCE_PARSERS, add_corpus_arguments, failed, pages_by_source, parse_outcome
+from domain.enums import PageType
+
+SCOPED_PAGE_TYPES = (PageType.page, PageType.download_page)
+
+def measure(parser, pages: list[dict], repeat: int) -> float:
+    """Среднее время разбора одной страницы, сек"""
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            parse_outcome(parser, page)
+    return (time.perf_counter() - started_at) / (repeat * len(pages))
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_corpus_arguments(arg_parser)
+    arg_parser.add_argument("--repeat", type=int, default=20, help="сколько раз прогонять каждую страницу")
+    args = arg_parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    grouped = pages_by_source(args)
+    if not grouped:
+        print("Нет сохранённых страниц для замера")
+        return 2
+    backends = [name for name in ("soup", "lxml") if create_backend(name).name == name]
+    print(f"{'источник':<11}{'бэкенд':<8}{'страница':<15}{'стр.':>5}{'целиком, мс':>13}{'элемент, мс':>13}{'ускорение':>11}")
+    for source, pages in grouped.items():
+        parser_class = SOURCE_PARSERS[source]
+        for backend in backends:
+            full = parser_class(backend=backend, scoped=False)
+            scoped = parser_class(backend=backend, scoped=True)
+            for page_type in SCOPED_PAGE_TYPES:
+                typed_pages = []
+                for page in (page for page in pages if page['page_type'] == page_type):
+                    expected = parse_outcome(full, page)
+                    if parse_outcome(scoped, page) != expected:
+                        print(f"Результат разбора {page['name']} ({PAGE_METHODS[page_type]}, {backend}) отличается")
+                        return 1
+                    if not failed(expected):
+                        typed_pages.append(page)
+                if not typed_pages:
+                    continue
+                full_time = measure(full, typed_pages, args.repeat)
+                scoped_time = measure(scoped, typed_pages, args.repeat)
+                print(
+                    f"{source:<11}{backend:<8}{page_type.name:<15}{len(typed_pages):>5}"
+                    f"{full_time * 1000:>13.3f}{scoped_time * 1000:>13.3f}{full_time / scoped_time:>10.1f}x"
+                )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
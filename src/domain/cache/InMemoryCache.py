@@ -3,12 +3,24 @@ import inspect
 from domain.cache.IndexNotifiable import IndexNotifiable
 from domain.cache.CacheBase import CacheBase
 
+def _has_value_equality(value) -> bool:
+    """Класс сравнивает объекты по значению и при этом хэшируем — такие объекты можно искать по словарю"""
+    cls = type(value)
+    return cls.__eq__ is not object.__eq__ and cls.__hash__ is not None
+
 class InMemoryCache(CacheBase):
     def __init__(self):
         self._cache = {}
         self._indexes = {}
         self._cls_index_fields = {}
         self._last_index_values = {}
+        # Обратные отображения объект → ключи: по id() объекта (объект жив, пока лежит в кэше)
+        # и по значению — для хэшируемых классов со своим __eq__. Один объект (или равные объекты)
+        # может лежать под несколькими ключами, поэтому ключи хранятся упорядоченным множеством (dict)
+        self._keys_by_identity = {}
+        self._keys_by_value = {}
+        # Сколько лежит объектов, которые сравниваются по значению, но не хэшируются: их contains ищет перебором
+        self._unhashable_count = 0
 
     def get(self, key):
         return self._cache.get(key)
@@ -19,15 +31,46 @@ class InMemoryCache(CacheBase):
     def contains(self, value):
         if hasattr(value, "id") and value.id is not None:
             return self.get(value.id)
-        else:
+        keys = self._keys_by_identity.get(id(value))
+        if keys:
+            return self._cache[next(iter(keys))]
+        if _has_value_equality(value):
+            keys = self._keys_by_value.get(value)
+            if keys:
+                return self._cache[next(iter(keys))]
+        if self._unhashable_count:
             for obj in self.get_all():
                 if obj == value:
                     return obj
-            return None
+        return None
+
+    def _link(self, key, value):
+        self._keys_by_identity.setdefault(id(value), {})[key] = None
+        if _has_value_equality(value):
+            self._keys_by_value.setdefault(value, {})[key] = None
+        elif type(value).__eq__ is not object.__eq__:
+            self._unhashable_count += 1
+
+    def _unlink(self, key, value):
+        self._discard_key(self._keys_by_identity, id(value), key)
+        if _has_value_equality(value):
+            self._discard_key(self._keys_by_value, value, key)
+        elif type(value).__eq__ is not object.__eq__:
+            self._unhashable_count -= 1
+
+    @staticmethod
+    def _discard_key(reverse_map, item, key):
+        keys = reverse_map.get(item)
+        if keys is None:
+            return
+        keys.pop(key, None)
+        if not keys:
+            del reverse_map[item]
 
     def remove(self, key):
             if key in self._cache:
                 obj = self._cache.pop(key)
+                self._unlink(key, obj)
                 
                 if key in self._last_index_values:
                     for field_name, old_value in self._last_index_values[key].items():
@@ -56,7 +99,10 @@ class InMemoryCache(CacheBase):
                     del idx_map[old_val]
 
         # ——— Шаг B: кладём в основной кэш — self._cache[key] = value ———
+        if key in self._cache:
+            self._unlink(key, self._cache[key])
         self._cache[key] = value
+        self._link(key, value)
 
         # ——— Шаг C: если value умеет регистрироваться в кэше, регистрируем ———
         if isinstance(value, IndexNotifiable):
@@ -106,6 +152,9 @@ class InMemoryCache(CacheBase):
         self._indexes.clear()
         self._cls_index_fields.clear()
         self._last_index_values.clear()
+        self._keys_by_identity.clear()
+        self._keys_by_value.clear()
+        self._unhashable_count = 0
 
     def __len__(self):
         return len(self._cache)
@@ -146,12 +195,9 @@ class InMemoryCache(CacheBase):
         #     у одного объекта несколько свойств-индексов, нам надо знать,
         #     к какому именно ключу обновлять self._last_index_values[key])
         #    
-        # Самый прямой (хоть и не самый эффективный) способ — линейный перебор:
-        cache_key = None
-        for k, v in self._cache.items():
-            if v is obj:
-                cache_key = k
-                break
+        # Ключ берётся из обратного отображения, которое поддерживают put/remove:
+        cache_keys = self._keys_by_identity.get(id(obj))
+        cache_key = next(iter(cache_keys)) if cache_keys else None
 
         if cache_key is None:
             # Объект не зарегистрирован в этом кэше (странно),
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Any
+from typing import Any, Optional
 import uuid
 from domain.cache.IndexNotifiable import indexed
 
@@ -8,11 +8,15 @@ class ParsingSession:
         self,
         source_id: str,
         parsing_date: datetime=datetime.now(),
-        id: str=None
+        id: str=None,
+        watermark: Optional[str]=None,
     ):
         self._parsing_date = parsing_date
         self.source_id = source_id
         self._id = id or uuid.uuid4()
+        # Ссылка на самую новую карточку каталога, до которой дошёл обход;
+        # следующий инкрементальный обход останавливается на ней
+        self.watermark = watermark
     
     @indexed
     @property        
@@ -27,11 +31,13 @@ class ParsingSession:
     def from_dict(data: dict[str, Any]) -> 'ParsingSession':
         return ParsingSession(
             parsing_date=data['parsing_date'],
-            id=data.get('id')
+            id=data.get('id'),
+            watermark=data.get('watermark'),
         )
         
     def to_dict(self) -> dict[str, Any]:
         return {
             'parsing_date': self.parsing_date,
-            'id': self.id
+            'id': self.id,
+            'watermark': self.watermark,
         }
\ No newline at end of file
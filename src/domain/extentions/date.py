@@ -1,5 +1,6 @@
-from datetime import datetime
-from typing import Optional
+import re
+from datetime import date, datetime
+from typing import Optional, Union
 
 def between(
     date, 
@@ -70,4 +71,26 @@ def date_parse(date_str: str):
     month = months[month_str]
     date_obj = datetime(year, month, day).date()
     
-    return date_obj
\ No newline at end of file
+    return date_obj
+
+DATE_RE = re.compile(r'(\d{1,2})\s+([а-яё]+)\s+(\d{4})|(\d{1,2})\.(\d{1,2})\.(\d{4})', flags=re.IGNORECASE)
+
+def find_date(text: str) -> Optional[date]:
+    """
+    Ищет в тексте первую дату вида '12 января 2024' или '12.01.2024'.
+    Возвращает None, если даты нет или она некорректна.
+    """
+    for match in DATE_RE.finditer(text):
+        try:
+            if match.group(1):
+                return date_parse(" ".join(match.group(1, 2, 3)))
+            return date(int(match.group(6)), int(match.group(5)), int(match.group(4)))
+        except ValueError:
+            continue
+    return None
+
+def to_date(value: Union[datetime, date, None]) -> Optional[date]:
+    """Приводит datetime к date, чтобы сравнивать с датами загрузки карточек"""
+    if isinstance(value, datetime):
+        return value.date()
+    return value
@@ -1,6 +1,7 @@
-from datetime import datetime
-from typing import Any, Optional
+from datetime import date, datetime
+from typing import Any, Callable, Optional
 
+from domain.extentions.date import to_date
 from domain.filters.Filter import CFilter
 from domain.filters.CFilterPipeline import CFilterPipeline
 
@@ -14,23 +15,65 @@ class CFilterBuilder:
         uploader_names: Optional[list[str]]=[],  
         include_tags: Optional[list[str]]=[],   
         except_tags: Optional[list[str]]=[],
+        types: Optional[list[str]]=[],
     )-> CFilterPipeline:
         cfilters: list[CFilter] = []        
-        if start_date and end_date:
-            cfilters.append(self._create_period_cfilter('upload_date', start_date, end_date, "Upload date period filter"))      
+        if start_date or end_date:
+            # Парсеры отдают дату загрузки без времени; открытая граница периода — без ограничения
+            cfilters.append(self._create_period_cfilter(
+                'upload_date',
+                to_date(start_date) or date.min,
+                to_date(end_date) or date.max,
+                "Upload date period filter",
+            ))      
+        if types:
+            cfilters.append(self._create_in_cfilter('type', types, 'any_of', "Type filter"))
         if author_names:
-            cfilters.append(self._create_in_cfilter('authors', author_names, "Author filter", any))    
+            cfilters.append(self._create_in_cfilter('authors', author_names, 'any_of', "Author filter"))    
         if translator_names:
-            cfilters.append(self._create_in_cfilter('translators', translator_names, "Translator filter", any))    
+            cfilters.append(self._create_in_cfilter('translators', translator_names, 'any_of', "Translator filter"))    
         if uploader_names:
-            cfilters.append(self._create_in_cfilter('uploader', uploader_names, "Uploader filter", any))   
+            cfilters.append(self._create_in_cfilter('uploader', uploader_names, 'any_of', "Uploader filter"))   
         if include_tags:
-            cfilters.append(self._create_not_in_cfilter('tags', include_tags, "Except tag filter", all))    
+            cfilters.append(self._create_in_cfilter('tags', include_tags, 'all_of', "Include tag filter"))    
         if except_tags:
-            cfilters.append(self._create_in_cfilter('tags', include_tags, "Include tag filter", all))
+            cfilters.append(self._create_in_cfilter('tags', except_tags, 'none_of', "Except tag filter"))
               
         return CFilterPipeline(cfilters)
         
+    def split(
+        self,
+        pipeline: CFilterPipeline,
+        catalog_path: Callable[[str, str], Optional[str]],
+    ) -> tuple[Optional[tuple[CFilter, str]], CFilterPipeline]:
+        """
+        Делит фильтры на тот, что может выполнить сайт, и те, что остаются локальными.
+        Сайт фильтрует каталог только по одному значению, поэтому выбирается один фильтр:
+        сначала обязательный тег (all_of), затем фильтр с единственным допустимым значением (any_of, eq).
+        Фильтр по нескольким обязательным значениям остаётся и локальным — сайт проверит лишь одно из них.
+
+        :param catalog_path: (поле, значение) → путь отфильтрованного каталога или None, если сайт так не умеет
+        :return: ((фильтр, значение для сайта) или None, пайплайн оставшихся фильтров)
+        """
+        filters = pipeline.filters
+        candidates = [f for f in filters if f.operator == 'all_of'] + [
+            f for f in filters if f.operator in ('any_of', 'eq')
+        ]
+        for cfilter in candidates:
+            if cfilter.operator == 'eq':
+                values = [cfilter.operand] if isinstance(cfilter.operand, str) else []
+            elif cfilter.operator == 'any_of' and len(cfilter.operand) != 1:
+                continue
+            else:
+                values = sorted(cfilter.operand)
+            for value in values:
+                if catalog_path(cfilter.field, value) is None:
+                    continue
+                if cfilter.operator == 'all_of' and len(cfilter.operand) > 1:
+                    return (cfilter, value), pipeline
+                return (cfilter, value), CFilterPipeline([f for f in filters if f is not cfilter])
+        return None, pipeline
+        
     def _create_period_cfilter(
         self,
         field: str,
@@ -38,28 +81,22 @@ class CFilterBuilder:
         end: Any,
         name: str = "Unnamed filter",
     ) -> CFilter:
-        condition = lambda data: start <= data[field] and data[field] <= end 
-        return CFilter(condition, name)
+        return CFilter(name=name, field=field, operator='between', operand=(start, end))
    
     def _create_in_cfilter(
         self,
         field: str,
         collection: list,
-        method,
-        name: str = "Unnamed filter",        
-    ) -> CFilter:
-        condition = lambda data: method(value in collection for value in data[field])
-        return CFilter(condition, name)
-    
-    def _create_not_in_cfilter(
-        self,
-        field: str,
-        collection: list,
-        method,
+        operator: str,
         name: str = "Unnamed filter",        
     ) -> CFilter:
-        condition = lambda data: method(value not in collection for value in data[field])
-        return CFilter(condition, name)   
+        """
+        Фильтр по именам в поле карточки. Имена сравниваются как строки, в каком бы виде
+        ни пришли значения (строки или словари {'name': ...}).
+
+        :param operator: 'any_of' — есть хотя бы одно из имён, 'all_of' — есть все, 'none_of' — нет ни одного
+        """
+        return CFilter(name=name, field=field, operator=operator, operand=collection)
     
     def _create_check_cfilter(
         self,
@@ -67,4 +104,4 @@ class CFilterBuilder:
         right: Any,
         name: str = "Unnamed filter",
     ) -> CFilter:
-        return CFilter(lambda data: data[field] == right, name)
\ No newline at end of file
+        return CFilter(name=name, field=field, operator='eq', operand=right)
\ No newline at end of file
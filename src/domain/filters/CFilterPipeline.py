@@ -1,26 +1,168 @@
-from typing import Dict, Any
+import logging
+import time
+from typing import Callable, Dict, Any
 
 from domain.filters.Filter import CFilter
 
+logger = logging.getLogger(__name__)
+
 class CFilterPipeline:
-    def __init__(self, filters: list[CFilter]):
+    # Сколько карточек фильтр должен проверить, чтобы его замеренной стоимости можно было доверять
+    MIN_EVALUATED = 100
+    # Пока первый фильтр не набрал MIN_EVALUATED замеров, замеряется каждый пакет, дальше — каждый SAMPLE_EVERY-й
+    SAMPLE_EVERY = 10
+
+    def __init__(self, filters: list[CFilter], adaptive: bool = True):
         """
-        :param condition: Лямбда-функция, принимающая комикс и возвращающая bool
+        :param filters: фильтры, которым комикс должен удовлетворять одновременно
+        :param adaptive: после каждого apply_many переупорядочивать фильтры по замеренным
+                         стоимости и доле отсеянных карточек
         """
         self._filters = filters.copy()
-        self._query = self._create(filters)
-    
-    def _create(self, filters: list) -> CFilter:        
-        combined = CFilter(lambda c: True)
-        for f in reversed(filters):
-            combined = combined & f
-        return combined
-    
+        self.adaptive = adaptive
+        self._ordered = sorted(filters, key=lambda f: f.cost)
+        self._query = self._create(self._ordered)
+        # Статистика по самим фильтрам, а не по именам: имена могут совпадать
+        self._stats = {f: {'evaluated': 0, 'passed': 0, 'seconds': 0.0} for f in filters}
+        self._batches = 0
+
+    @property
+    def filters(self) -> list[CFilter]:
+        return self._filters.copy()
+
+    def _create(self, filters: list[CFilter]) -> Callable[[Dict[str, Any]], bool]:
+        """
+        Собирает фильтры в один плоский предикат: проверки идут подряд (от дешёвых к дорогим)
+        и прекращаются на первой непройденной, без вложенных вызовов на каждый фильтр.
+        """
+        checks = [f.compile() for f in filters]
+        if not checks:
+            return lambda comix_info: True
+        if len(checks) == 1:
+            return checks[0]
+
+        def query(comix_info: Dict[str, Any]) -> bool:
+            for check in checks:
+                if not check(comix_info):
+                    return False
+            return True
+        return query
+
     def apply(self, comix_info: Dict[str, Any]) -> bool:
-        return self._query.apply(comix_info)
-    
+        return self._query(comix_info)
+
     def apply_many(self, comics_info: list[Dict[str, Any]]) -> list[bool]:
-        mask = [True]*len(comics_info)
-        for i, comix_info in enumerate(comics_info):
-            mask[i] = self.apply(comix_info)
-        return mask
\ No newline at end of file
+        """
+        Проверяет пакет карточек. Пакеты для статистики проверяются фильтр за фильтром (каждый следующий
+        фильтр видит только прошедшие предыдущие), остальные — плоским предикатом в текущем порядке.
+        Результат в обоих случаях тот же, что у apply.
+        """
+        if not self.adaptive or not self._should_sample():
+            query = self._query
+            return [query(comix_info) for comix_info in comics_info]
+        alive = list(range(len(comics_info)))
+        for cfilter in self._ordered:
+            if not alive:
+                break
+            check = cfilter.compile()
+            started_at = time.perf_counter()
+            passed = [i for i in alive if check(comics_info[i])]
+            stats = self._stats[cfilter]
+            stats['seconds'] += time.perf_counter() - started_at
+            stats['evaluated'] += len(alive)
+            stats['passed'] += len(passed)
+            alive = passed
+        mask = [False] * len(comics_info)
+        for i in alive:
+            mask[i] = True
+        self._reorder()
+        return mask
+
+    def _should_sample(self) -> bool:
+        self._batches += 1
+        if not self._ordered:
+            return False
+        warming_up = self._stats[self._ordered[0]]['evaluated'] < self.MIN_EVALUATED
+        return warming_up or self._batches % self.SAMPLE_EVERY == 0
+
+    def _reorder(self):
+        """
+        Упорядочивает фильтры по стоимости одной отсеянной карточки: стоимость проверки / доля отсеянных.
+        Пока фильтр проверил мало карточек, его стоимость оценивается по заявленной (CFilter.cost),
+        пересчитанной в секунды по уже замеренным фильтрам.
+        """
+        measured = [(f, self._stats[f]) for f in self._ordered if self._stats[f]['evaluated'] >= self.MIN_EVALUATED]
+        if not measured:
+            return
+        seconds_per_cost = sum(s['seconds'] for _, s in measured) / sum(s['evaluated'] * f.cost for f, s in measured)
+
+        def rank(cfilter: CFilter) -> float:
+            stats = self._stats[cfilter]
+            if stats['evaluated'] >= self.MIN_EVALUATED:
+                cost = stats['seconds'] / stats['evaluated']
+            else:
+                cost = cfilter.cost * seconds_per_cost
+            # Сглаживание Лапласа: у непроверенного фильтра доля отсеянных — 1/2, и она никогда не равна нулю
+            rejection = 1 - (stats['passed'] + 1) / (stats['evaluated'] + 2)
+            return cost / rejection
+
+        ordered = sorted(self._ordered, key=rank)
+        if ordered != self._ordered:
+            logger.debug(f"Новый порядок фильтров: {[f.name for f in ordered]}")
+            self._ordered = ordered
+            self._query = self._create(ordered)
+
+    def statistics(self) -> dict[str, dict[str, Any]]:
+        """
+        Доля прошедших карточек и средняя стоимость проверки по каждому фильтру, в текущем порядке проверки.
+        Считаются только пакеты, отобранные для замеров. Совпадающие имена фильтров нумеруются: «имя #2».
+        """
+        statistics = {}
+        for cfilter in self._ordered:
+            stats = self._stats[cfilter]
+            evaluated = stats['evaluated']
+            name, number = cfilter.name, 1
+            while name in statistics:
+                number += 1
+                name = f"{cfilter.name} #{number}"
+            statistics[name] = {
+                'evaluated': evaluated,
+                'passed': stats['passed'],
+                'pass_rate': round(stats['passed'] / evaluated, 4) if evaluated else None,
+                'cost_us': round(stats['seconds'] / evaluated * 1e6, 3) if evaluated else None,
+            }
+        return statistics
+
+    @staticmethod
+    def columns(comics_info: list[Dict[str, Any]]):
+        """
+        Столбцовое представление карточек (CardColumns) для apply_columns или None, если NumPy не установлен.
+        Построение стоит дороже одного построчного прохода, поэтому окупается при повторных фильтрациях
+        одного и того же большого списка, например всего локального каталога.
+        """
+        try:
+            from domain.filters.CardColumns import CardColumns
+        except ImportError as ex:
+            logger.debug(f"Столбцовая фильтрация недоступна ({ex}), карточки проверяются по одной")
+            return None
+        return CardColumns(comics_info)
+
+    def apply_columns(self, columns):
+        """
+        Маска (numpy.ndarray) по столбцам карточек, с тем же результатом, что и построчная проверка.
+        Фильтры, которые не вычисляются векторно, проверяются построчно и только на ещё не отсеянных карточках.
+        """
+        import numpy as np
+
+        mask = np.ones(columns.size, dtype=bool)
+        rowwise = []
+        for cfilter in self._ordered:
+            filter_mask = columns.evaluate(cfilter)
+            if filter_mask is None:
+                rowwise.append(cfilter.compile())
+            else:
+                mask &= filter_mask
+        for check in rowwise:
+            for i in np.flatnonzero(mask):
+                mask[i] = check(columns.cards[i])
+        return mask
@@ -0,0 +1,89 @@
+from datetime import date
+from typing import Any, Optional
+
+import numpy as np
+
+from domain.filters.Filter import CFilter, names
+
+class CardColumns:
+    def __init__(self, cards: list[dict[str, Any]]):
+        """
+        Столбцовое представление списка карточек для пакетной фильтрации.
+        Столбцы строятся по требованию и переиспользуются всеми последующими фильтрациями того же списка:
+        даты — порядковыми номерами дней, имена (теги, авторы, загрузчики) — интернированными id
+        в сжатом построчном виде (CSR): ids строки i лежат в ids[indptr[i]:indptr[i+1]].
+        """
+        self.cards = cards
+        self.size = len(cards)
+        self._ordinals: dict[str, Optional[tuple[np.ndarray, np.ndarray]]] = {}
+        self._names: dict[str, tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict[str, int]]] = {}
+
+    def ordinals(self, field: str) -> Optional[tuple[np.ndarray, np.ndarray]]:
+        """
+        (порядковые номера дат, маска отсутствующих значений) или None, если в поле встречаются не даты:
+        их сравнение оставляется построчной проверке.
+        """
+        if field not in self._ordinals:
+            values = np.zeros(self.size, dtype=np.int64)
+            missing = np.zeros(self.size, dtype=bool)
+            column = (values, missing)
+            for i, card in enumerate(self.cards):
+                value = card.get(field)
+                if value is None:
+                    missing[i] = True
+                elif type(value) is date:
+                    values[i] = value.toordinal()
+                else:
+                    column = None
+                    break
+            self._ordinals[field] = column
+        return self._ordinals[field]
+
+    def names(self, field: str) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict[str, int]]:
+        """
+        (indptr, ids, номер строки каждого id, маска отсутствующих значений, словарь имя → id).
+        Имена внутри строки не повторяются.
+        """
+        if field not in self._names:
+            vocabulary: dict[str, int] = {}
+            indptr = np.zeros(self.size + 1, dtype=np.int64)
+            missing = np.zeros(self.size, dtype=bool)
+            ids: list[int] = []
+            for i, card in enumerate(self.cards):
+                value = card.get(field)
+                if value is None:
+                    missing[i] = True
+                else:
+                    ids.extend(vocabulary.setdefault(name, len(vocabulary)) for name in names(value))
+                indptr[i + 1] = len(ids)
+            rows = np.repeat(np.arange(self.size), np.diff(indptr))
+            self._names[field] = (indptr, np.asarray(ids, dtype=np.int32), rows, missing, vocabulary)
+        return self._names[field]
+
+    def evaluate(self, cfilter: CFilter) -> Optional[np.ndarray]:
+        """Маска фильтра по столбцам или None, если фильтр векторно не вычисляется"""
+        if cfilter.operator == 'between':
+            column = self.ordinals(cfilter.field)
+            if column is None:
+                return None
+            values, missing = column
+            start, end = cfilter.operand
+            if type(start) is not date or type(end) is not date:
+                return None
+            mask = (values >= start.toordinal()) & (values <= end.toordinal())
+        elif cfilter.operator in ('any_of', 'all_of', 'none_of'):
+            _, ids, rows, missing, vocabulary = self.names(cfilter.field)
+            wanted = np.fromiter(
+                (vocabulary[name] for name in cfilter.operand if name in vocabulary), dtype=np.int32
+            )
+            found = np.bincount(rows[np.isin(ids, wanted)], minlength=self.size)
+            if cfilter.operator == 'any_of':
+                mask = found > 0
+            elif cfilter.operator == 'none_of':
+                mask = found == 0
+            else:
+                # Имени, которого нет ни у одной карточки, не найдётся и здесь: len(wanted) < len(operand)
+                mask = found == len(cfilter.operand)
+        else:
+            return None
+        return np.where(missing, cfilter.missing, mask)
@@ -1,34 +1,106 @@
-from typing import Callable, Dict, Any
+from typing import Callable, Dict, Any, Optional
+
+def names(value: Any) -> set[str]:
+    """Имена из значения поля карточки: строка, словарь {'name': ...} или их список"""
+    if isinstance(value, (str, dict)):
+        value = (value,)
+    return {item['name'] if isinstance(item, dict) else item for item in value}
+
+# Оператор → (построитель проверки по значению поля, относительная стоимость, результат при отсутствии поля).
+# Отсутствием считается и None: дата не разобралась, поле не заполнено.
+# Пустой список — не отсутствие: у карточки просто нет тегов.
+OPERATORS: dict[str, tuple[Callable[[Any], Callable[[Any], bool]], float, bool]] = {
+    # Значение в периоде [start, end]
+    'between': (lambda operand: lambda value: operand[0] <= value <= operand[1], 1.0, False),
+    'eq': (lambda operand: lambda value: value == operand, 1.0, False),
+    # Есть хотя бы одно имя из operand
+    'any_of': (lambda operand: lambda value: not operand.isdisjoint(names(value)), 2.0, False),
+    # Есть все имена из operand
+    'all_of': (lambda operand: lambda value: operand.issubset(names(value)), 2.0, False),
+    # Нет ни одного имени из operand: карточка без поля ничего запрещённого не содержит
+    'none_of': (lambda operand: lambda value: operand.isdisjoint(names(value)), 2.0, True),
+}
 
 class CFilter:
-    def __init__(self, condition: Callable[[Dict[str, Any]], bool], name="Unnamed filter"):
+    def __init__(
+        self,
+        condition: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        name="Unnamed filter",
+        field: Optional[str] = None,
+        operator: Optional[str] = None,
+        operand: Any = None,
+        cost: Optional[float] = None,
+        missing: Optional[bool] = None,
+    ):
         """
-        :param condition: Лямбда-функция, принимающая комикс и возвращающая bool
+        :param condition: Лямбда-функция, принимающая комикс и возвращающая bool.
+                          Не нужна, если фильтр описан полем, оператором и операндом
+        :param field: поле карточки, которое проверяет фильтр
+        :param operator: один из OPERATORS
+        :param operand: значение для сравнения; для операторов над именами — множество имён
+        :param cost: относительная стоимость проверки (больше нуля), дешёвые фильтры проверяются первыми
+        :param missing: результат для карточки без поля; по умолчанию — принятый для оператора
         """
+        if operator is not None:
+            if operator not in OPERATORS:
+                raise ValueError(f"Неизвестный оператор фильтра: {operator}")
+            if operator in ('any_of', 'all_of', 'none_of'):
+                operand = frozenset(names(operand))
+            build, default_cost, default_missing = OPERATORS[operator]
+            cost = default_cost if cost is None else cost
+            missing = default_missing if missing is None else missing
+            self._compiled = self._compile(field, build(operand), missing)
+        elif condition is None:
+            raise ValueError("Фильтру нужно условие или оператор")
+        if cost is not None and cost <= 0:
+            raise ValueError(f"Стоимость фильтра должна быть больше нуля: {cost}")
         self._condition = condition
         self._name = name
-    
+        self.field = field
+        self.operator = operator
+        self.operand = operand
+        self.cost = 1.0 if cost is None else cost
+        self.missing = bool(missing)
+
     @property
     def name(self) -> str:
         return self._name
-    
-    def apply(self, comix_info: Dict[str, Any]) -> bool:  
+
+    @staticmethod
+    def _compile(field: str, check: Callable[[Any], bool], missing: bool) -> Callable[[Dict[str, Any]], bool]:
+        def compiled(comix_info: Dict[str, Any]) -> bool:
+            value = comix_info.get(field)
+            if value is None:
+                return missing
+            return check(value)
+        return compiled
+
+    def compile(self) -> Callable[[Dict[str, Any]], bool]:
+        """
+        Проверка для горячего пути. У фильтров с оператором — без перехвата исключений:
+        отсутствие поля обрабатывается явно, остальные ошибки — ошибки данных и не должны тихо отсеивать карточки.
+        """
+        return self.apply if self.operator is None else self._compiled
+
+    def apply(self, comix_info: Dict[str, Any]) -> bool:
         """Проверяет, удовлетворяет ли комикс условию фильтра"""
+        if self.operator is not None:
+            return self._compiled(comix_info)
         try:
             return self._condition(comix_info)
         except KeyError as e:
             return False
         except Exception as e:
             return False
-    
+
     def __and__(self, other: 'CFilter') -> 'CFilter':
         """Комбинирует фильтры через логическое И"""
         return CFilter(lambda c: self.apply(c) and other.apply(c))
-    
+
     def __or__(self, other: 'CFilter') -> 'CFilter':
         """Комбинирует фильтры через логическое ИЛИ"""
         return CFilter(lambda c: self.apply(c) or other.apply(c))
-    
+
     def __invert__(self) -> 'CFilter':
         """Инвертирует фильтр"""
-        return CFilter(lambda c: not self.apply(c))
\ No newline at end of file
+        return CFilter(lambda c: not self.apply(c))
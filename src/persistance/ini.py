@@ -1,6 +1,6 @@
 import os
 from pathlib import Path
-from sqlalchemy import text
+from sqlalchemy import inspect, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import ArgumentError
@@ -23,6 +23,21 @@ from persistance.mapping.mappers.TagMapper import TagMapper
 from persistance.mapping.mappers.UserMapper import UserMapper
 from persistance.models.BaseModel import Base
 
+# Колонки, добавленные в существующие таблицы: create_all не меняет уже созданные таблицы
+ADDED_COLUMNS = {
+    'parsing_sessions': {
+        'watermark': 'VARCHAR',
+    },
+}
+
+def _add_missing_columns(connection):
+    inspector = inspect(connection)
+    for table, columns in ADDED_COLUMNS.items():
+        existing = {column['name'] for column in inspector.get_columns(table)}
+        for column, column_type in columns.items():
+            if column not in existing:
+                connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+
 class Initializator:
     def __init__(self, config: Config):
         self._config = config  
@@ -55,6 +70,7 @@ class Initializator:
 
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(_add_missing_columns)
 
             initial_file_path = self._config.get_db_initial_file()
             if initial_file_path and os.path.exists(initial_file_path):
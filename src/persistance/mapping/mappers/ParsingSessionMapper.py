@@ -16,7 +16,8 @@ class ParsingSessionMapper(MapperBase[ParsingSession, ParsingSessionModel]):
         return ParsingSessionModel(
             id=domain.id,
             parsing_date=domain.parsing_date,
-            source_id=domain.source_id
+            source_id=domain.source_id,
+            watermark=domain.watermark,
         )
     
     def map_from(self, persistence: ParsingSessionModel) -> ParsingSession:
@@ -24,4 +25,5 @@ class ParsingSessionMapper(MapperBase[ParsingSession, ParsingSessionModel]):
             id=persistence.id,
             source_id=persistence.source_id,
             parsing_date=persistence.parsing_date,
+            watermark=persistence.watermark,
         )
\ No newline at end of file
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, DateTime, ForeignKey, Integer
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -10,6 +10,7 @@ class ParsingSession(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     source_id = Column(Integer, ForeignKey('sources.id'))
     parsing_date = Column(DateTime)
+    watermark = Column(String, nullable=True)
     
     source = relationship("Source", back_populates="parsing_sessions", lazy='selectin')
     chapters = relationship("Chapter", back_populates="parsing_session", lazy='selectin')
\ No newline at end of file
@@ -1,3 +1,5 @@
+from typing import Optional
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from domain.cache.CacheBase import CacheBase
@@ -9,4 +11,15 @@ from persistance.repositories.CachedRepository import CachedRepository
 
 class ParsingSessionRepository(CachedRepository[ParsingSession, ParsingSessionModel]):
     def __init__(self, session: Session, cache: CacheBase, mapper: MappingDirector):
-        super().__init__(session, cache, ParsingSessionModel, mapper)
\ No newline at end of file
+        super().__init__(session, cache, ParsingSessionModel, mapper)
+    
+    async def get_last_watermark(self, source_id: int) -> Optional[str]:
+        """Ориентир инкрементального обхода из последней сессии источника, в которой он был сохранён"""
+        query = (
+            select(ParsingSessionModel.watermark)
+            .where(ParsingSessionModel.source_id == source_id, ParsingSessionModel.watermark.is_not(None))
+            .order_by(ParsingSessionModel.parsing_date.desc())
+            .limit(1)
+        )
+        result = await self._session.execute(query)
+        return result.scalars().first()
\ No newline at end of file